@@ -3,6 +3,12 @@ import math
 import random
 from mathutils import Matrix, Vector, Euler
 import os
+import sys
+
+# Sibling helper modules (blender -P does not add the script folder to sys.path)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from mesh_cache import (MeshCache, SHAPEGEN_BAKE_SETTINGS as BAKE_SETTINGS,
+                        build_objects, capture_objects, shapegen_cache_key, shapegen_key_settings)
 
 # -----------------------------------------------------------------------------
 # CONFIGURATION
@@ -13,6 +19,11 @@ filepath_name = "/Users/albert/Documents/GitHub/Human_AI_Benchmark"
 output_path = os.path.join(filepath_name, "ShapeGen_Sequence")
 os.makedirs(output_path, exist_ok=True)
 
+# Shared with ShapeGen_batch.py: a shape baked there (same amount/seed, either --bake-config) loads instantly
+preview_seed = 97
+preview_amount = 3
+MESH_CACHE_DIR = os.path.join(filepath_name, "ShapeGen", ".mesh_cache")
+
 # -----------------------------------------------------------------------------
 # HELPER FUNCTIONS
 # -----------------------------------------------------------------------------
@@ -53,9 +64,21 @@ def rotate_pivot_world_axis(pivot_obj, angle_rad, axis_name):
 
 clear_scene()
 
-# 1. Generate & Bake (Standard Setup)
-bpy.ops.mesh.shape_generator()
-gen_collection = bpy.data.collections.get("Generated Shape Collection")
+# 0. Baked mesh cache lookup
+mesh_cache = MeshCache(MESH_CACHE_DIR)
+# The preview bakes property by property (the "legacy" config), so it only shares those
+# entries; batched bakes are not verified to produce the same mesh
+cache_key = shapegen_cache_key(preview_amount, preview_seed, shapegen_key_settings("legacy"))
+cached_arrays = mesh_cache.load(cache_key)
+
+# 1. Generate & Bake (Standard Setup), unless the cache already has it
+gen_collection = None
+if cached_arrays is not None:
+    print(f"Loaded baked shape from cache: {cache_key}")
+    build_objects(cached_arrays, bpy.context.scene.collection)
+else:
+    bpy.ops.mesh.shape_generator()
+    gen_collection = bpy.data.collections.get("Generated Shape Collection")
 
 if gen_collection:
     bpy.ops.object.select_all(action='DESELECT')
@@ -66,13 +89,13 @@ if gen_collection:
 try:
     if gen_collection:
         props = gen_collection.shape_generator_properties
-        props.random_seed = 97
-        props.amount = 3
-        props.mirror_x = False; props.mirror_y = False; props.mirror_z = False
+        props.random_seed = preview_seed
+        props.amount = preview_amount
+        props.mirror_x = BAKE_SETTINGS["mirror_x"]; props.mirror_y = BAKE_SETTINGS["mirror_y"]; props.mirror_z = BAKE_SETTINGS["mirror_z"]
         
         # Smooth Modifiers
-        props.is_bevel = True; props.bevel_segments = 10
-        props.is_subsurf = True; props.subsurf_segments = 2
+        props.is_bevel = BAKE_SETTINGS["is_bevel"]; props.bevel_segments = BAKE_SETTINGS["bevel_segments"]
+        props.is_subsurf = BAKE_SETTINGS["is_subsurf"]; props.subsurf_segments = BAKE_SETTINGS["subsurf_segments"]
         
         # Apply standard modifiers
         shapeGenObj = bpy.context.view_layer.objects.active
@@ -83,9 +106,9 @@ try:
 
         # Bake Setup
         for obj in gen_collection.objects: obj.select_set(True)
-        props.join_objects = True
-        props.bake_smooth_result = True
-        props.bake_object = True
+        props.join_objects = BAKE_SETTINGS["join_objects"]
+        props.bake_smooth_result = BAKE_SETTINGS["bake_smooth_result"]
+        props.bake_object = BAKE_SETTINGS["bake_object"]
 
         # Apply Bake Modifiers & Shade Smooth
         if shapeGenObj:
@@ -97,9 +120,13 @@ try:
                 bpy.ops.object.modifier_apply(modifier="Shape Generator Smooth")
             
             bpy.ops.object.shade_smooth()
-            bpy.ops.object.origin_set(type='ORIGIN_GEOMETRY', center='BOUNDS')
+            bpy.ops.object.origin_set(type='ORIGIN_GEOMETRY', center=BAKE_SETTINGS["origin"])
             bpy.ops.object.transform_apply(location=False, rotation=False, scale=True)
 
+        baked_obj = bpy.data.objects.get('Generated Shape')
+        if baked_obj:
+            mesh_cache.store(cache_key, capture_objects([baked_obj]))
+
 except Exception as e:
     print(f"Error: {e}")
 
@@ -2,39 +2,73 @@ import bpy
 import math
 import random
 import os
-from mathutils import Matrix, Vector, Euler
+import sys
+import time
+import argparse
+import json
+import numpy as np
+from mathutils import Matrix, Vector
+
+# Sibling helper modules (blender -P does not add the script folder to sys.path)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from completion_journal import CompletionJournal, count_renders
+from mesh_cache import (MeshCache, SHAPEGEN_BAKE_CONFIGS, SHAPEGEN_BAKE_SETTINGS as BAKE_SETTINGS,
+                        build_objects, capture_objects, shapegen_cache_key, shapegen_key_settings)
+from render_scene import SceneTemplate, clear_scene, render_views
+from render_cache import OrientationCache
+from atlas import AtlasRenderer
+from shard_writer import open_output, sequence_meta
+from png_writer import add_png_arguments, setup_png_output
+from stage_timer import NullTimer, mesh_stats, open_timer
+from rotation_plan import SEQUENCE_RNGS, hashed_steps
+from memory_guard import MemoryGuard, restart_count, writer_suffix
 
 # -----------------------------------------------------------------------------
 # CONFIGURATION
 # -----------------------------------------------------------------------------
 BASE_OUTPUT_DIR = "/Users/albert/Documents/GitHub/Human_AI_Benchmark/ShapeGen"
 
-# angles_to_process = [15, 30, 45, 60, 75]  # Loop over these angles
-angles_to_process = [15, 30, 45] 
+# Default angles; override on the command line, e.g. -- 15 30 45 60 75
+angles_to_process = [15, 30, 45]
 amount_count = 10                         # 1 to 10 extrusions
 rotate_num = 1800                         # 0 to 1799 iterations per amount
 loop_count = 7                           # Number of rotations per shape
+camera_distance = 7.0
+resolution = 1080
+
+# Completion journal (a seed folder counts as done only once all renders are written)
+JOURNAL_DIR = os.path.join(BASE_OUTPUT_DIR, ".journal")
+
+# Baked-mesh cache: every parameter that determines the bake goes into the key
+MESH_CACHE_DIR = os.path.join(BASE_OUTPUT_DIR, ".mesh_cache")
+MESH_CACHE_MAX_GB = 20.0
+
+# Per-seed stage timings (JSONL), None = off; --timing-log overrides
+TIMING_LOG_DIR = None
+
+# Restart Blender (resuming from the journal) once RSS exceeds this many MB, 0 = never
+MAX_RSS_MB = 0
+
+# Output backend: "dir" (one PNG folder per seed) or "tar" (WebDataset shards under BASE_OUTPUT_DIR/shards)
+OUTPUT_FORMAT = "dir"
+TAR_SHARD_MB = 1024
+
+# shape_generator_properties in assignment order; the last bake property triggers the rebuild
+GENERATOR_SHAPE_PROPERTIES = ["mirror_x", "mirror_y", "mirror_z",
+                              "is_bevel", "bevel_segments", "is_subsurf", "subsurf_segments"]
+GENERATOR_BAKE_PROPERTIES = ["join_objects", "bake_smooth_result", "bake_object"]
+
+# One of SHAPEGEN_BAKE_CONFIGS; --bake-config overrides. "batched" stays opt-in until
+# --compare-bakes (benchmark.py --compare-bakes) shows it bakes the same vertices
+BAKE_CONFIG = "legacy"
 
 # -----------------------------------------------------------------------------
 # HELPER FUNCTIONS
 # -----------------------------------------------------------------------------
 
-def clear_scene():
-    """Clears everything: Meshes, Lights, Cameras, Collections."""
-    for collection in list(bpy.data.collections):
-        for obj in collection.objects:
-            bpy.data.objects.remove(obj, do_unlink=True)
-        bpy.data.collections.remove(collection)
-    
-    for obj in list(bpy.data.objects):
-        bpy.data.objects.remove(obj, do_unlink=True)
-    
-    for block in [bpy.data.meshes, bpy.data.materials, bpy.data.textures, bpy.data.images]:
-        for item in block:
-            block.remove(item)
-
-def rotate_pivot_locally(pivot_obj, angle_rad, axis_name):
-        # Standard World Axes (Fixed)
+def rotate_pose_world_axis(pose, angle_rad, axis_name):
+    """Pivot pose after one more rotation about a fixed world axis."""
+    # Standard World Axes (Fixed)
     axis_map = {
         'X': Vector((1, 0, 0)),
         'Y': Vector((0, 1, 0)),
@@ -44,14 +78,93 @@ def rotate_pivot_locally(pivot_obj, angle_rad, axis_name):
     rot_mat = Matrix.Rotation(angle_rad, 4, vec)
     
     # GLOBAL ROTATION: Put rot_mat FIRST
-    # This applies the rotation along the fixed World Axis
-    parent_empty.matrix_world = rot_mat @ parent_empty.matrix_world
+    # This applies the rotation along the fixed World Axis (pivot stays at the center)
+    return rot_mat @ pose
+
+def plan_sequence_views(base_path, rotation_increment, steps=None):
+    """
+    (pivot_pose, filepath) for the base view + loop_count random world-axis rotations.
+    `steps` come from rotation_plan; without them the global `random` stream is used (legacy).
+    """
+    rotation_order_str = "base"
+    pose = Matrix.Identity(4)
+    views = [(pose, os.path.join(base_path, f"{rotation_order_str}.png"))]
+    
+    for step in range(loop_count):
+        if steps is not None:
+            axis, direction = steps[step]
+        else:
+            axis = random.choice(['X', 'Y', 'Z'])
+            direction = random.choice([-1, 1])
+        angle = direction * rotation_increment
+        
+        rot_symbol = f"{'-' if direction == -1 else ''}{axis}"
+        rotation_order_str += f"_{rot_symbol}"
+        
+        pose = rotate_pose_world_axis(pose, angle, axis)
+        views.append((pose, os.path.join(base_path, f"{rotation_order_str}.png")))
     
-    # Ensure it stays at center
-    parent_empty.location = Vector((0,0,0))
+    return views
 
-def shapeGenGenerator(amount, seed):
-    """Generates the shape and applies Baking (Clay look)."""
+def _shape_signature(collection):
+    """
+    Identity and size of the generated objects and meshes; changes whenever the add-on
+    rebuilds the shape, including rebuilds that refill the same mesh datablock in place.
+    """
+    uid = lambda block: getattr(block, "session_uid", None) or block.as_pointer()
+    def geometry(o):
+        if o.type != 'MESH':
+            return ()
+        return (len(o.data.vertices), len(o.data.polygons), tuple(round(d, 6) for d in o.dimensions))
+    return tuple(sorted((uid(o), uid(o.data) if o.data else 0, geometry(o)) for o in collection.objects))
+
+def configure_generator(props, collection, values, batched=True):
+    """
+    Applies `values` (property name -> value, in order) to shape_generator_properties
+    and returns how many rebuilds of the shape that caused. Every RNA assignment
+    runs the add-on's update callback (a full regenerate); batched writes all but
+    the last value as raw ID properties, which skips the callbacks, so only the
+    final assignment regenerates, with the complete parameter set.
+    """
+    names = list(values)
+    rebuilds = 0
+    signature = _shape_signature(collection)
+    for i, name in enumerate(names):
+        value = values[name]
+        if batched and i < len(names) - 1:
+            try:
+                props[name] = int(value) if isinstance(value, bool) else value
+                continue
+            except (TypeError, KeyError, ValueError):
+                pass  # not an ID property; fall back to the (triggering) RNA assignment
+        setattr(props, name, value)
+        current = _shape_signature(collection)
+        if current != signature:
+            rebuilds += 1
+            signature = current
+    return rebuilds
+
+def _select_generated(gen_collection):
+    """Selects ALL parts so 'Join Objects' finds them, with the main shape active (it survives the join)."""
+    bpy.ops.object.select_all(action='DESELECT')
+    for obj in gen_collection.objects:
+        obj.select_set(True)
+        if obj.name == 'Generated Shape':
+            bpy.context.view_layer.objects.active = obj
+
+def _apply_modifiers(obj, names):
+    bpy.context.view_layer.objects.active = obj
+    for mod in [m.name for m in obj.modifiers if m.name in names]:  # stack order
+        bpy.ops.object.modifier_apply(modifier=mod)
+
+def shapeGenGenerator(amount, seed, batched=True, timer=None):
+    """
+    Generates the shape and applies Baking (Clay look).
+    batched: the full parameter set is configured first and the add-on
+    regenerates + bakes once; otherwise (legacy) every property assignment
+    regenerates. The rebuild count goes to the timer as 'regenerations'.
+    """
+    timer = timer or NullTimer()
     # 1. GENERATE
     bpy.ops.mesh.shape_generator()
     gen_collection = bpy.data.collections.get("Generated Shape Collection")
@@ -59,59 +172,48 @@ def shapeGenGenerator(amount, seed):
     if not gen_collection:
         return None
 
+    shape_values = {"random_seed": seed, "amount": amount}
+    for name in GENERATOR_SHAPE_PROPERTIES:
+        shape_values[name] = BAKE_SETTINGS[name]
+    bake_values = {name: BAKE_SETTINGS[name] for name in GENERATOR_BAKE_PROPERTIES}
+
     try:
         props = gen_collection.shape_generator_properties
-        props.random_seed = seed
-        props.amount = amount
-        props.mirror_x = False; props.mirror_y = False; props.mirror_z = False
-        
-        # 2. STANDARD SMOOTHING
-        props.is_bevel = True; props.bevel_segments = 10
-        props.is_subsurf = True; props.subsurf_segments = 2
-        
-        # Apply standard modifiers NOW to freeze geometry
-        # We look up the object fresh to avoid stale references
-        obj_ref = bpy.data.objects.get('Generated Shape')
-        if obj_ref:
-            bpy.context.view_layer.objects.active = obj_ref
-            for mod in ["Bevel", "Mirror", "Subdivision"]:
-                if mod in obj_ref.modifiers:
-                    bpy.ops.object.modifier_apply(modifier=mod)
-
-        # 3. BAKING (The Destructive Step)
-        # Force select ALL parts so 'Join Objects' finds them
-        bpy.ops.object.select_all(action='DESELECT')
-        for obj in gen_collection.objects:
-            obj.select_set(True)
-            # Make the main shape active if possible, to ensure it survives the join
-            if obj.name == 'Generated Shape':
-                bpy.context.view_layer.objects.active = obj
-
-        # Enable Baking Props
-        props.join_objects = True        # <--- This likely deletes old references!
-        props.bake_smooth_result = True
-        props.bake_object = True
+        if batched:
+            # 2. ONE REBUILD: everything silently, then the bake flag triggers generate + bake
+            _select_generated(gen_collection)
+            rebuilds = configure_generator(props, gen_collection, {**shape_values, **bake_values})
+        else:
+            # 2. STANDARD SMOOTHING (one rebuild per property)
+            rebuilds = configure_generator(props, gen_collection, shape_values, batched=False)
+
+            # Apply standard modifiers NOW to freeze geometry
+            # We look up the object fresh to avoid stale references
+            obj_ref = bpy.data.objects.get('Generated Shape')
+            if obj_ref:
+                _apply_modifiers(obj_ref, ["Bevel", "Mirror", "Subdivision"])
+
+            # 3. BAKING (The Destructive Step)
+            _select_generated(gen_collection)
+            rebuilds += configure_generator(props, gen_collection, bake_values, batched=False)
+        timer.note(regenerations=rebuilds)
         
         # 4. APPLY BAKE & POLISH
         # CRITICAL: Re-fetch the object. The old pointer is likely dead.
         final_obj = bpy.data.objects.get('Generated Shape')
         
         if final_obj:
-            bpy.context.view_layer.objects.active = final_obj
             final_obj.select_set(True)
             
-            # Apply Bake Modifiers
-            if "Shape Generator Remesh" in final_obj.modifiers:
-                bpy.ops.object.modifier_apply(modifier="Shape Generator Remesh")
-            
-            if "Shape Generator Smooth" in final_obj.modifiers:
-                bpy.ops.object.modifier_apply(modifier="Shape Generator Smooth")
+            # Apply Bake Modifiers (batched: plus the standard ones the single rebuild left live)
+            bake_modifiers = ["Shape Generator Remesh", "Shape Generator Smooth"]
+            _apply_modifiers(final_obj, (["Bevel", "Mirror", "Subdivision"] if batched else []) + bake_modifiers)
             
             # Force Smooth Shading
             bpy.ops.object.shade_smooth()
             
             # Center Origin & Apply Scale
-            bpy.ops.object.origin_set(type='ORIGIN_GEOMETRY', center='BOUNDS')
+            bpy.ops.object.origin_set(type='ORIGIN_GEOMETRY', center=BAKE_SETTINGS["origin"])
             bpy.ops.object.transform_apply(location=False, rotation=False, scale=True)
             
             return final_obj
@@ -123,88 +225,260 @@ def shapeGenGenerator(amount, seed):
         print(f"Error in shapeGenGenerator: {e}")
         return None
 
+def load_or_generate(amount, seed, mesh_cache, key_settings, timer=None, batched=True):
+    """Rebuilds the baked shape from the mesh cache, or bakes it and stores the result."""
+    timer = timer or NullTimer()
+    if mesh_cache is None:
+        with timer.stage("bake"):
+            return shapeGenGenerator(amount, seed, batched, timer)
+
+    cache_key = shapegen_cache_key(amount, seed, key_settings)
+    with timer.stage("cache_load"):
+        cached_arrays = mesh_cache.load(cache_key)
+    if cached_arrays is not None:
+        with timer.stage("cache_build"):
+            objects = build_objects(cached_arrays, bpy.context.scene.collection)
+        return objects[0] if objects else None
+
+    with timer.stage("bake"):
+        shape_obj = shapeGenGenerator(amount, seed, batched, timer)
+    if shape_obj:
+        with timer.stage("cache_store"):
+            mesh_cache.store(cache_key, capture_objects([shape_obj]))
+    return shape_obj
+
+def compare_bakes(amounts, seeds, report_path=None):
+    """
+    Bakes every (amount, seed) with both SHAPEGEN_BAKE_CONFIGS (no mesh cache) and
+    compares the captured arrays: topology must be identical, vertex positions and
+    object matrices equal within 1e-5. Writes a JSON report; returns True if all match.
+    """
+    mismatched = []
+    shapes = 0
+    for amount in amounts:
+        for seed in seeds:
+            captured = {}
+            for bake_config in SHAPEGEN_BAKE_CONFIGS:
+                clear_scene()
+                shape_obj = shapeGenGenerator(amount, seed, bake_config == "batched")
+                captured[bake_config] = capture_objects([shape_obj]) if shape_obj else None
+            shapes += 1
+
+            legacy, batched = captured["legacy"], captured["batched"]
+            if legacy is None or batched is None:
+                reason = "bake failed"
+            elif any(not np.array_equal(legacy[name], batched[name]) for name in ("loops", "poly_starts", "object_counts")):
+                reason = (f"topology differs ({len(legacy['vertices'])} vs {len(batched['vertices'])} vertices, "
+                          f"{len(legacy['poly_starts'])} vs {len(batched['poly_starts'])} faces)")
+            elif not np.allclose(legacy["object_matrices"], batched["object_matrices"], atol=1e-5):
+                reason = "object matrix differs"
+            else:
+                max_error = float(np.abs(legacy["vertices"] - batched["vertices"]).max(initial=0.0))
+                reason = f"vertices differ by up to {max_error:.6f}" if max_error > 1e-5 else None
+
+            print(f"{amount}/{seed}: {reason or 'identical'}")
+            if reason:
+                mismatched.append({"amount": amount, "seed": seed, "reason": reason})
+    clear_scene()
+
+    report = {"shapes": shapes, "mismatched": mismatched, "match": not mismatched}
+    if report_path:
+        with open(report_path, "w") as f:
+            json.dump(report, f, indent=2)
+    print(f"Bake comparison: {shapes - len(mismatched)}/{shapes} shapes identical (batched vs legacy)")
+    return report["match"]
+
 # -----------------------------------------------------------------------------
 # MAIN EXECUTION LOOP
 # -----------------------------------------------------------------------------
 
-# --- LOOP 1: ANGLES (15, 30, 45, 60, 75) ---
-for angle_deg in angles_to_process:
-    rotation_increment = math.radians(angle_deg)
-    print(f"--- Starting Batch for Angle: {angle_deg}° ---")
-    
-    current_angle_path = os.path.join(BASE_OUTPUT_DIR, str(angle_deg))
+# Angles come from the command line: blender -b -P ShapeGen_batch.py -- 15 30 45 60 75
+if "--" in sys.argv:
+    args = sys.argv[sys.argv.index("--") + 1:]
+else:
+    args = []
+
+parser = argparse.ArgumentParser(
+    prog="blender -b -P ShapeGen_batch.py --",
+    description="Bake Shape Generator shapes and render rotation sequences."
+)
+parser.add_argument("angles", nargs="*", type=float,
+                    help=f"Rotation step(s) in degrees (default: {angles_to_process})")
+parser.add_argument("--amounts", nargs="+", type=int, default=None,
+                    help=f"Extrusion amounts to render (default: 1..{amount_count})")
+parser.add_argument("--seeds", nargs="+", type=int, default=None,
+                    help=f"Seeds to render per amount (default: 0..{rotate_num - 1})")
+parser.add_argument("--sequence-rng", choices=SEQUENCE_RNGS, default="hash",
+                    help="'hash': steps from a hash of (amount/seed, angle, step); 'legacy': unseeded random")
+parser.add_argument("--backfill-journal", action="store_true",
+                    help="Journal seed folders that already hold loop_count + 1 PNGs (automatic while the journal is empty)")
+parser.add_argument("--max-rss-mb", type=float, default=MAX_RSS_MB,
+                    help="Restart Blender (resumes from the journal) once RSS exceeds this (0 = never)")
+parser.add_argument("--output-dir", default=BASE_OUTPUT_DIR,
+                    help="Root folder for renders; the journal lives in <output-dir>/.journal")
+parser.add_argument("--mesh-cache", default=MESH_CACHE_DIR,
+                    help="Folder for baked meshes (default: MESH_CACHE_DIR)")
+parser.add_argument("--mesh-cache-gb", type=float, default=MESH_CACHE_MAX_GB,
+                    help="Disk budget of the mesh cache; least recently used entries are evicted")
+parser.add_argument("--no-mesh-cache", action="store_true", help="Always run the add-on bake")
+parser.add_argument("--bake-config", choices=SHAPEGEN_BAKE_CONFIGS, default=BAKE_CONFIG,
+                    help="'legacy': every property assignment regenerates; 'batched': set all add-on "
+                         "properties, then regenerate + bake once (faster, not yet verified to bake the same mesh)")
+parser.add_argument("--compare-bakes", nargs="?", const="", default=None, metavar="REPORT_JSON",
+                    help="Only bake the selected amounts/seeds with both bake configs and compare the meshes "
+                         "(optionally writing a JSON report); exits 1 on any difference")
+parser.add_argument("--no-view-cache", action="store_true",
+                    help="Always render, even when an orientation was already rendered for the shape")
+parser.add_argument("--atlas-tiles", type=int, default=0,
+                    help="Render up to N views per render call as an orthographic atlas (0 = off)")
+parser.add_argument("--output-format", choices=["dir", "tar"], default=OUTPUT_FORMAT,
+                    help="'dir': one PNG folder per seed; 'tar': WebDataset tar shards + index")
+parser.add_argument("--tar-shard-mb", type=float, default=TAR_SHARD_MB,
+                    help="Size cap of one tar shard in MB (--output-format tar)")
+add_png_arguments(parser)
+parser.add_argument("--render-border", action="store_true",
+                    help="Shade only the region the shape's projected bounding box covers (same PNGs)")
+parser.add_argument("--border-margin", type=int, default=4,
+                    help="Extra pixels around the projected box for --render-border")
+parser.add_argument("--timing-log", default=TIMING_LOG_DIR,
+                    help="Folder for per-seed stage timings (JSONL, one file per process)")
+options = parser.parse_args(args)
+
+if options.angles:
+    angles_to_process = [int(a) if a.is_integer() else a for a in options.angles]
+amounts = options.amounts or range(1, amount_count + 1)
+seeds = options.seeds if options.seeds is not None else range(rotate_num)
+if options.output_dir != BASE_OUTPUT_DIR:
+    BASE_OUTPUT_DIR = options.output_dir
+    JOURNAL_DIR = os.path.join(BASE_OUTPUT_DIR, ".journal")
+
+if options.compare_bakes is not None:
+    sys.exit(0 if compare_bakes(amounts, seeds, options.compare_bakes or None) else 1)
+
+mesh_cache = None
+if not options.no_mesh_cache:
+    mesh_cache = MeshCache(options.mesh_cache, int(options.mesh_cache_gb * 1024 ** 3))
+cache_key_settings = shapegen_key_settings(options.bake_config)
+
+print(f"--- Angles: {', '.join(f'{a}°' for a in angles_to_process)} ---")
+
+# Camera, RotationPivot and render settings are built once for the whole run
+writer_name = f"shapegen-{os.getpid()}{writer_suffix()}"
+timer = open_timer(options.timing_log, writer_name)
+setup_start = time.perf_counter()
+template = SceneTemplate(camera_distance, resolution, backface_culling=True)
+if options.render_border:
+    template.enable_render_border(options.border_margin)
+view_cache = None if options.no_view_cache else OrientationCache()
+png_writer = setup_png_output(template.scene, options)
+atlas = AtlasRenderer(template, options.atlas_tiles, png_writer=png_writer) if options.atlas_tiles > 1 else None
+timer.event("setup", seconds=round(time.perf_counter() - setup_start, 4))
+
+journal = CompletionJournal(JOURNAL_DIR, writer_name)
+output = open_output(options.output_format, BASE_OUTPUT_DIR, writer_name, options.tar_shard_mb)
+print(f"Journal: {len(journal)} sequences already done ({JOURNAL_DIR})")
+# A first run over an existing tree must not clear finished folders
+backfill = options.backfill_journal or journal.is_new
+if backfill and not options.backfill_journal:
+    print("Empty journal: finished folders are backfilled instead of re-rendered")
+
+memory_guard = MemoryGuard(options.max_rss_mb)
+if restart_count():
+    print(f"Restart #{restart_count()}: resuming from the journal")
+
+def close_run():
+    """Flushes everything a restart or the end of the run must leave on disk."""
+    if png_writer:
+        png_writer.close()
+    output.close()
+    journal.close()
+    timer.close()
+
+# --- LOOP 1: AMOUNT (1 to 10) ---
+for amount in amounts:
     
-    # --- LOOP 2: AMOUNT (1 to 10) ---
-    for amount in range(1, amount_count + 1):
+    # --- LOOP 2: ITERATIONS (0 to 1799) ---
+    for seed in seeds:
         
-        # --- LOOP 3: ITERATIONS (0 to 1799) ---
-        for i in range(rotate_num):
-            seed = i  # The seed is simply the current index
+        # --- SKIP LOGIC ---
+        # In-memory journal lookup per angle; half-written folders are not journaled and get redone
+        pending = []
+        for angle_deg in angles_to_process:
+            # Sequence key = journal key = output folder / tar sample key
+            sequence_key = f"{angle_deg}/{amount}/{seed}"
             
-            # Construct the path first to check existence
-            base_path = os.path.join(current_angle_path, str(amount), str(seed))
-            
-            # --- SKIP LOGIC ---
-            # If the folder exists AND contains files, skip this iteration
-            if os.path.exists(base_path) and os.listdir(base_path):
-                print(f"Skipping existing data: {base_path}")
+            if sequence_key in journal:
                 continue
             
-            # If we didn't skip, create the folder and proceed
-            os.makedirs(base_path, exist_ok=True)
-            
-            clear_scene()
+            base_path = os.path.join(BASE_OUTPUT_DIR, str(angle_deg), str(amount), str(seed))
+            if backfill and count_renders(base_path) >= loop_count + 1:
+                journal.mark_done(sequence_key, backfilled=True)
+                continue
             
-            # 2. Generate Object
-            shape_obj = shapeGenGenerator(amount, seed)
-            if not shape_obj: continue
+            pending.append((angle_deg, sequence_key))
+        
+        if not pending:
+            continue
+        
+        timer.start(f"{amount}/{seed}", amount=amount, seed=seed, angles=[job[0] for job in pending])
+        
+        # 1. Swap out the previous shape (camera, pivot and render settings persist)
+        with timer.stage("clear_model"):
+            template.clear_model()
+        if view_cache:
+            view_cache.reset()
+        
+        # 2. Generate Object (baked ONCE, rendered for every pending angle)
+        shape_obj = load_or_generate(amount, seed, mesh_cache, cache_key_settings, timer,
+                                     options.bake_config == "batched")
+        if not shape_obj:
+            timer.note(status="generate_failed")
+            timer.finish()
+            continue
+        timer.note(**mesh_stats([shape_obj]))
 
-            # 3. Setup Pivot
+        # 3. Attach to Pivot
+        with timer.stage("parent"):
             shape_obj.location = Vector((0, 0, 0))
             shape_obj.rotation_euler = (0, 0, 0)
+            template.add_objects([shape_obj])
+        
+        # --- LOOP 3: ANGLES (same baked shape) ---
+        sequences = []
+        for angle_deg, sequence_key in pending:
+            # Empty output folder (leftovers from an interrupted run are cleared)
+            base_path = output.prepare(sequence_key)
             
-            bpy.ops.object.empty_add(type='PLAIN_AXES', location=(0,0,0))
-            parent_empty = bpy.context.object
-            parent_empty.name = "RotationPivot"
-            
-            shape_obj.parent = parent_empty
-            
-            # 4. Setup Camera
-            bpy.ops.object.camera_add()
-            camera = bpy.context.object
-            camera.location = Vector((0, -7.0, 0))
-            camera.rotation_euler = Euler((math.radians(90), 0, 0), 'XYZ')
-            
-            # 5. Render Settings
-            scene = bpy.context.scene
-            scene.camera = camera
-            scene.render.engine = 'BLENDER_WORKBENCH'
-            scene.render.resolution_x = 1080
-            scene.render.resolution_y = 1080
-            scene.display.shading.light = 'STUDIO'
-            scene.display.shading.color_type = 'MATERIAL'
-            scene.display.shading.show_backface_culling = True
-            scene.render.film_transparent = True
-            
-            # 6. Render Loop (Base + Rotations)
-            rotation_order_str = "base"
-            
-            # Render Base
-            scene.render.filepath = os.path.join(base_path, f"{rotation_order_str}.png")
-            bpy.ops.render.render(write_still=True)
-            
-            # Rotation Steps
-            for step in range(loop_count):
-                axis = random.choice(['X', 'Y', 'Z'])
-                direction = random.choice([-1, 1])
-                angle = direction * rotation_increment
-                
-                rot_symbol = f"{'-' if direction == -1 else ''}{axis}"
-                rotation_order_str += f"_{rot_symbol}"
-                
-                rotate_pivot_locally(parent_empty, angle, axis)
-                
-                scene.render.filepath = os.path.join(base_path, f"{rotation_order_str}.png")
-                bpy.ops.render.render(write_still=True)
+            # 6. Plan (Base + Rotations); every angle starts from the rest pose
+            steps = None
+            if options.sequence_rng == "hash":
+                steps = hashed_steps("ShapeGen", f"{amount}/{seed}", angle_deg, loop_count)
+            sequences.append(plan_sequence_views(base_path, math.radians(angle_deg), steps))
+        
+        # 7. Render (repeated orientations are linked; an atlas packs several views per call)
+        render_views(template, [view for seq in sequences for view in seq], view_cache, atlas, png_writer, timer)
+        template.reset_pivot()
+        
+        # 8. Hand each sequence (+ rotation metadata) to the backend, then journal it
+        with timer.stage("finish"):
+            for (angle_deg, sequence_key), seq in zip(pending, sequences):
+                output.finish(sequence_key, sequence_meta(seq, dataset="ShapeGen", amount=amount, seed=seed,
+                                                          rotation_degree=angle_deg, sequence_rng=options.sequence_rng))
+                journal.mark_done(sequence_key)
+        
+        # Seed boundary: purge orphan datablocks, sample RSS, recycle the process if needed
+        over_limit = memory_guard.end_model(timer)
+        timer.finish()
+        if over_limit:
+            close_run()
+            memory_guard.restart()
 
+close_run()
+print(f"RSS: {memory_guard.start_rss_mb:.0f} MB at start, {memory_guard.last_rss_mb:.0f} MB at end")
+if view_cache:
+    print(f"View cache: {view_cache.summary()}")
+if atlas:
+    print(f"Atlas: {atlas.calls} render calls")
+if mesh_cache:
+    print(f"Mesh cache: {mesh_cache.hits} hits, {mesh_cache.misses} misses, {mesh_cache.evictions} evictions")
 print("All angles processed successfully!")
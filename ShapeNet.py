@@ -2,6 +2,7 @@ import bpy
 import math
 import random
 from mathutils import Matrix, Vector, Euler
+import numpy as np
 import os
 
 
@@ -22,20 +23,15 @@ def clear_scene():
 
 def get_collection_center(objects):
     """Calculates the center of mass (Average of all Vertices)."""
-    total_center = Vector((0, 0, 0))
-    total_vertices = 0
-    
+    chunks = []
     for obj in objects:
         if obj.type == 'MESH':
-            world_matrix = obj.matrix_world
-            for v in obj.data.vertices:
-                world_v = world_matrix @ v.co
-                total_center += world_v
-                total_vertices += 1
-    
-    if total_vertices > 0:
-        return total_center / total_vertices
-    return Vector((0, 0, 0))
+            co = np.empty(len(obj.data.vertices) * 3, dtype=np.float32)
+            obj.data.vertices.foreach_get("co", co)
+            world_matrix = np.array(obj.matrix_world, dtype=np.float64)
+            chunks.append(co.reshape(-1, 3) @ world_matrix[:3, :3].T + world_matrix[:3, 3])
+    points = np.concatenate(chunks) if chunks else np.zeros((0, 3))
+    return Vector(points.mean(axis=0)) if len(points) else Vector((0, 0, 0))
 
 def rotate_pivot_locally(angle_rad, axis_name):
     # Standard World Axes (Fixed)
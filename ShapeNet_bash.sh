@@ -9,35 +9,31 @@ BLENDER_PATH="/Applications/Blender.app/Contents/MacOS/Blender"
 # Path to your Python script
 SCRIPT_PATH="ShapeNet_batch.py"
 
-# List of rotation angles to process sequentially
+# Number of parallel Blender workers (each renders a slice of directory.txt)
+WORKERS=$(getconf _NPROCESSORS_ONLN)
+
+# List of rotation angles; every model is imported once and rendered at all of them
 ANGLES=(15 30)
 
 # -----------------------------------------------------------------------------
-# EXECUTION LOOP
+# EXECUTION
 # -----------------------------------------------------------------------------
 
-echo "🚀 Starting Sequential Batch Processing..."
+echo "🚀 Starting Batch Processing..."
 echo "=========================================="
+echo "▶️  Processing Angles: ${ANGLES[*]}"
+echo "------------------------------------------"
+
+# Launch $WORKERS background Blender instances (-b) with the python script (-P)
+python3 ShapeNet_pool.py --blender "$BLENDER_PATH" --script "$SCRIPT_PATH" \
+    --workers "$WORKERS" --log-dir "logs" -- "${ANGLES[@]}"
 
-for angle in "${ANGLES[@]}"; do
-    echo ""
-    echo "------------------------------------------"
-    echo "▶️  Processing Angle: $angle°"
-    echo "------------------------------------------"
-    
-    # Execute Blender in background mode (-b) with the python script (-P)
-    "$BLENDER_PATH" -b -P "$SCRIPT_PATH" -- "$angle"
-    
-    # Check if the previous command was successful
-    if [ $? -eq 0 ]; then
-        echo "✅ Angle $angle° completed successfully."
-    else
-        echo "❌ Angle $angle° failed."
-        # Optional: exit 1 # Uncomment if you want the whole script to stop on error
-    fi
-    
-    echo "------------------------------------------"
-done
+# Check if the previous command was successful
+if [ $? -eq 0 ]; then
+    echo "✅ Angles ${ANGLES[*]} completed successfully."
+else
+    echo "❌ Angles ${ANGLES[*]} failed."
+fi
 
 echo ""
 echo "🎉 All batches finished."
@@ -1,9 +1,28 @@
 import bpy
 import math
 import random
-from mathutils import Matrix, Vector, Euler
+from mathutils import Matrix, Vector
 import os
 import sys
+import time
+import argparse
+
+# Sibling helper modules (blender -P does not add the script folder to sys.path)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from mesh_cache import MeshCache, build_objects, capture_objects, merge_objects
+from completion_journal import CompletionJournal, count_renders
+from render_scene import SceneTemplate, get_collection_center, render_views
+from render_cache import OrientationCache
+from atlas import AtlasRenderer
+from shard_writer import open_output, sequence_meta
+from png_writer import add_png_arguments, setup_png_output
+from stage_timer import NullTimer, mesh_stats, open_timer
+from model_index import job_cost, load_model_index
+from prefetch import ModelPrefetcher
+from dataset_resolver import add_dataset_arguments, resolver_from_options
+from rotation_plan import SEQUENCE_RNGS, hashed_steps
+from memory_guard import MemoryGuard, restart_count, writer_suffix
+from obj_loader import load_obj_arrays
 
 # -----------------------------------------------------------------------------
 # GLOBAL CONFIGURATION
@@ -13,47 +32,26 @@ INPUT_FILE_NAME = "directory.txt"
 # Base directory for output
 BASE_OUTPUT_DIR = "/Users/albert/Documents/GitHub/Human_AI_Benchmark/ShapeNet"
 
-# Your specific root path setup
+# Your specific root path setup (dataset root; the layout is picked with --layout)
 FILEPATH_NAME = '/Users/albert'
 
+# Renders per sequence (base + 6 rotations)
+SEQUENCE_LENGTH = 7
+
+# Camera / render settings shared by every model
+CAMERA_DISTANCE = 3.0
+RESOLUTION = 512
+
+# Fixed world axes used for every rotation step
+AXIS_VECTORS = {'X': Vector((1, 0, 0)), 'Y': Vector((0, 1, 0)), 'Z': Vector((0, 0, 1))}
+
 # -----------------------------------------------------------------------------
 # HELPER FUNCTIONS
 # -----------------------------------------------------------------------------
 
-def clear_scene():
-    """Clears everything: Meshes, Lights, Cameras."""
-    if bpy.context.active_object and bpy.context.active_object.mode != 'OBJECT':
-        bpy.ops.object.mode_set(mode='OBJECT')
-        
-    bpy.ops.object.select_all(action='SELECT')
-    bpy.ops.object.delete()
-    
-    # Purge orphan data
-    for block in bpy.data.meshes: bpy.data.meshes.remove(block)
-    for block in bpy.data.materials: bpy.data.materials.remove(block)
-    for block in bpy.data.textures: bpy.data.textures.remove(block)
-    for block in bpy.data.images: bpy.data.images.remove(block)
-
-def get_collection_center(objects):
-    """Calculates the center of mass (Average of all Vertices)."""
-    total_center = Vector((0, 0, 0))
-    total_vertices = 0
-    
-    for obj in objects:
-        if obj.type == 'MESH':
-            world_matrix = obj.matrix_world
-            for v in obj.data.vertices:
-                world_v = world_matrix @ v.co
-                total_center += world_v
-                total_vertices += 1
-    
-    if total_vertices > 0:
-        return total_center / total_vertices
-    return Vector((0, 0, 0))
-
 def rotate_via_unparent_reset(pivot_obj, child_objects, angle_rad, axis_name):
     """
-    ROBUST ROTATION LOGIC:
+    ROBUST ROTATION LOGIC (reference implementation, see build_pose_sequence):
     1. Rotate Pivot (Children follow).
     2. Clear Parent (Keep Transform) -> Children stay visually rotated.
     3. Reset Pivot to 0,0,0 -> Pivot axes re-align with World.
@@ -61,8 +59,7 @@ def rotate_via_unparent_reset(pivot_obj, child_objects, angle_rad, axis_name):
     """
     # A. Rotate Pivot
     # Since pivot is reset to 0,0,0 every time, Local Rotation == Global Rotation
-    axis_map = {'X': Vector((1, 0, 0)), 'Y': Vector((0, 1, 0)), 'Z': Vector((0, 0, 1))}
-    vec = axis_map[axis_name]
+    vec = AXIS_VECTORS[axis_name]
     rot_mat = Matrix.Rotation(angle_rad, 4, vec)
     pivot_obj.matrix_world = pivot_obj.matrix_world @ rot_mat
     
@@ -90,20 +87,105 @@ def rotate_via_unparent_reset(pivot_obj, child_objects, angle_rad, axis_name):
     bpy.context.view_layer.objects.active = pivot_obj
     bpy.ops.object.parent_set(type='OBJECT', keep_transform=True)
 
+# -----------------------------------------------------------------------------
+# POSE ENGINE
+# -----------------------------------------------------------------------------
+def plan_rotation_steps(step_count):
+    """Draws (axis, direction) per step, in the same random call order as before."""
+    steps = []
+    for _ in range(step_count):
+        axis = random.choice(['X', 'Y', 'Z'])
+        direction = random.choice([-1, 1])
+        steps.append((axis, direction))
+    return steps
+
+def build_pose_sequence(steps, angle_rad):
+    """
+    Cumulative Pivot matrices for base + every step. Each step rotates about the
+    fixed WORLD axis (rot @ previous), which is exactly what the unparent/reset
+    approach produces, so a render step is one matrix_world assignment.
+    """
+    poses = [Matrix.Identity(4)]
+    for axis, direction in steps:
+        rot_mat = Matrix.Rotation(direction * angle_rad, 4, AXIS_VECTORS[axis])
+        poses.append(rot_mat @ poses[-1])
+    return poses
+
+def verify_pose_engine(pivot_obj, child_objects, steps, angle_rad, tolerance=1e-5):
+    """
+    Matrix-equality check of build_pose_sequence against rotate_via_unparent_reset.
+    Leaves the children in the centered rest pose. Returns the max element error.
+    """
+    reset_pivot(pivot_obj)
+    rest_matrices = [obj.matrix_basis.copy() for obj in child_objects]
+
+    reference = []
+    for axis, direction in steps:
+        rotate_via_unparent_reset(pivot_obj, child_objects, direction * angle_rad, axis)
+        bpy.context.view_layer.update()
+        reference.append([obj.matrix_world.copy() for obj in child_objects])
+
+    # Undo the baked legacy rotations
+    pivot_obj.matrix_world = Matrix.Identity(4)
+    for obj, rest in zip(child_objects, rest_matrices):
+        obj.matrix_parent_inverse = Matrix.Identity(4)
+        obj.matrix_basis = rest
+
+    max_error = 0.0
+    for pose, expected in zip(build_pose_sequence(steps, angle_rad)[1:], reference):
+        pivot_obj.matrix_world = pose
+        bpy.context.view_layer.update()
+        for obj, ref in zip(child_objects, expected):
+            for row, ref_row in zip(obj.matrix_world, ref):
+                max_error = max(max_error, max(abs(a - b) for a, b in zip(row, ref_row)))
+
+    reset_pivot(pivot_obj)
+    if max_error > tolerance:
+        print(f"❌ Pose engine mismatch: max error {max_error:.2e}")
+    else:
+        print(f"✅ Pose engine matches unparent/reset (max error {max_error:.2e})")
+    return max_error
+
+def reset_pivot(pivot_obj):
+    """Puts the Pivot back to identity, i.e. the centered rest pose of its children."""
+    pivot_obj.matrix_world = Matrix.Identity(4)
+    bpy.context.view_layer.update()
+
 # -----------------------------------------------------------------------------
 # RENDER LOGIC
 # -----------------------------------------------------------------------------
-def process_model(full_obj_path, target_output_path, model_id_str, rotation_degree):
-    loop = 7
-    collection_name = "ImportedMeshes"
+def plan_sequence_views(target_output_path, model_id_int, rotation_degree, steps=None):
+    """
+    (pivot_pose, filepath) for base + (loop - 1) random rotations. The file name
+    records every step taken, e.g. base_X_-Z_Y.png. Without precomputed `steps`
+    (rotation_plan), the legacy model_id + angle seeded `random` sequence is used.
+    """
+    loop = SEQUENCE_LENGTH
     rotation_increment = math.radians(rotation_degree)
 
-    clear_scene()
+    if steps is None:
+        seed_val = model_id_int + int(rotation_degree)
+        random.seed(seed_val)
+        steps = plan_rotation_steps(loop - 1)
+
+    poses = build_pose_sequence(steps, rotation_increment)
 
-    # 1. Import
+    views = []
+    rotation_order_str = "base"
+    for i, pose in enumerate(poses):
+        if i > 0:
+            axis, direction = steps[i - 1]
+            rot_symbol = f"{'-' if direction == -1 else ''}{axis}"
+            rotation_order_str += f"_{rot_symbol}"
+
+        views.append((pose, os.path.join(target_output_path, f"{rotation_order_str}.png")))
+    return views
+
+def import_model(full_obj_path, new_collection):
+    """Imports the OBJ and moves its meshes into new_collection. Returns the meshes or None."""
     if not os.path.exists(full_obj_path):
         print(f"❌ Error: Model file not found at {full_obj_path}")
-        return
+        return None
 
     try:
         bpy.ops.wm.obj_import(
@@ -114,88 +196,131 @@ def process_model(full_obj_path, target_output_path, model_id_str, rotation_degr
         )
     except Exception as e:
         print(f"❌ Import Failed: {e}")
-        return
+        return None
 
     imported_objects = [o for o in bpy.context.selected_objects if o.type == 'MESH']
     
     if not imported_objects:
         print("❌ Warning: No meshes found in OBJ.")
-        return
+        return None
 
-    # 2. Organize Collection
-    new_collection = bpy.data.collections.new(collection_name)
-    bpy.context.scene.collection.children.link(new_collection)
     for obj in imported_objects:
         if obj.users_collection:
             for c in obj.users_collection:
                 c.objects.unlink(obj)
         new_collection.objects.link(obj)
 
-    # 3. Center Object
-    c1 = get_collection_center(imported_objects)
-    for obj in imported_objects:
-        obj.matrix_world = Matrix.Translation(-c1) @ obj.matrix_world
+    return imported_objects
 
-    # 4. Parenting
-    world_origin = Vector((0, 0, 0))
-    bpy.ops.object.empty_add(type='PLAIN_AXES', location=world_origin)
-    parent_empty = bpy.context.object
-    parent_empty.name = "RotationPivot"
+def load_native(full_obj_path, new_collection):
+    """Parses the OBJ/MTL with obj_loader (NumPy) and builds the meshes with foreach_set. Returns the meshes or None."""
+    if not os.path.exists(full_obj_path):
+        print(f"❌ Error: Model file not found at {full_obj_path}")
+        return None
 
-    # Initial Parent Set (Robust)
-    bpy.ops.object.select_all(action='DESELECT')
-    for obj in imported_objects:
-        obj.select_set(True)
-    parent_empty.select_set(True)
-    bpy.context.view_layer.objects.active = parent_empty
-    bpy.ops.object.parent_set(type='OBJECT', keep_transform=True)
+    try:
+        arrays = load_obj_arrays(full_obj_path)
+    except (OSError, ValueError, IndexError) as e:
+        print(f"❌ Import Failed: {e}")
+        return None
 
-    # 5. Camera
-    bpy.ops.object.camera_add()
-    camera = bpy.context.object
-    scene = bpy.context.scene
-    scene.camera = camera
-    camera.location = Vector((0, -3.0, 0))
-    camera.rotation_euler = Euler((math.radians(90), 0, 0), 'XYZ')
-
-    # 6. Render Settings
-    scene.render.engine = 'BLENDER_WORKBENCH'
-    scene.render.resolution_x = 512
-    scene.render.resolution_y = 512
-    scene.display.shading.light = 'STUDIO'
-    scene.display.shading.color_type = 'MATERIAL'
-    scene.display.shading.show_backface_culling = False
-    scene.render.film_transparent = True
-
-    # 7. Random Seed
+    if not len(arrays["object_counts"]):
+        print("❌ Warning: No meshes found in OBJ.")
+        return None
+
+    return build_objects(arrays, new_collection)
+
+def process_model(template, output, full_obj_path, angle_jobs, model_id_str, *, mesh_cache=None, cache_key=None,
+                  verify_pose=False, journal=None, view_cache=None, atlas=None, png_writer=None, timer=None,
+                  center=None, prefetched=None, sequence_rng="hash", merge_parts=False, loader="bpy"):
+    """
+    Loads the model ONCE (importer, native loader, mesh cache or prefetch) and renders a
+    sequence for every (rotation_degree, sequence_key) in angle_jobs into the output
+    backend. Each angle starts from the centered rest pose; a sequence key is journaled
+    only after the backend has all of its renders. Everything after model_id_str is an
+    optional, keyword-only feature switch (all off by default).
+    """
+    timer = timer or NullTimer()
+    with timer.stage("clear_model"):
+        template.clear_model()
+    if view_cache:
+        view_cache.reset()
+
+    # 1. Import (or rebuild from the binary mesh cache) into the template collection
+    cached_arrays = parsed_arrays = None
+    if prefetched is not None:
+        if prefetched.parsed:
+            parsed_arrays = prefetched.arrays
+        else:
+            cached_arrays = prefetched.arrays
+        full_obj_path = prefetched.obj_path
+    elif mesh_cache:
+        with timer.stage("cache_load"):
+            cached_arrays = mesh_cache.load(cache_key)
+    if cached_arrays is not None:
+        with timer.stage("cache_build"):
+            imported_objects = build_objects(cached_arrays, template.collection)
+    else:
+        with timer.stage("import"):
+            if parsed_arrays is not None and len(parsed_arrays["object_counts"]):
+                # Parsed by the prefetch thread (native loader)
+                imported_objects = build_objects(parsed_arrays, template.collection)
+            elif loader == "native":
+                imported_objects = load_native(full_obj_path, template.collection)
+            else:
+                imported_objects = import_model(full_obj_path, template.collection)
+        if imported_objects and merge_parts:
+            timer.note(parts=len(imported_objects))
+            with timer.stage("merge"):
+                imported_objects = merge_objects(imported_objects, template.collection, model_id_str)
+        if imported_objects and mesh_cache:
+            with timer.stage("cache_store"):
+                mesh_cache.store(cache_key, capture_objects(imported_objects))
+
+    if not imported_objects:
+        timer.note(status="import_failed")
+        return
+    timer.note(**mesh_stats(imported_objects))
+
+    # 2. Center Object
+    with timer.stage("center"):
+        c1 = Vector(center) if center is not None else get_collection_center(imported_objects)
+        for obj in imported_objects:
+            obj.matrix_world = Matrix.Translation(-c1) @ obj.matrix_world
+
+    # 3. Parenting (pivot is identity, so the centered transforms are kept)
+    with timer.stage("parent"):
+        template.add_objects(imported_objects)
+    parent_empty = template.pivot
+
+    # 4. Random Seed
     try:
         model_id_int = int(model_id_str[-6:], 16)
     except:
         model_id_int = 12345
-    
-    seed_val = model_id_int + int(rotation_degree)
-    random.seed(seed_val)
-
-    # 8. Render Loop
-    rotation_order_str = "base"
-
-    scene.render.filepath = os.path.join(target_output_path, f"{rotation_order_str}.png")
-    bpy.ops.render.render(write_still=True)
-    
-    for i in range(1, loop):
-        axis = random.choice(['X', 'Y', 'Z'])
-        direction = random.choice([-1, 1])
-        angle = direction * rotation_increment
-
-        rot_symbol = f"{'-' if direction == -1 else ''}{axis}"
-        rotation_order_str += f"_{rot_symbol}"
 
-        # USE ROBUST ROTATION LOGIC
-        # We pass the list of objects so they can be detached and re-attached
-        rotate_via_unparent_reset(parent_empty, imported_objects, angle, axis)
-        
-        scene.render.filepath = os.path.join(target_output_path, f"{rotation_order_str}.png")
-        bpy.ops.render.render(write_still=True)
+    if verify_pose:
+        random.seed(model_id_int)
+        verify_pose_engine(parent_empty, imported_objects, plan_rotation_steps(SEQUENCE_LENGTH - 1), math.radians(angle_jobs[0][0]))
+
+    # 5. Plan every angle's sequence (same imported model)
+    sequences = []
+    for rotation_degree, sequence_key in angle_jobs:
+        target_output_path = output.prepare(sequence_key)
+        steps = hashed_steps("ShapeNet", model_id_str, rotation_degree, SEQUENCE_LENGTH - 1) if sequence_rng == "hash" else None
+        sequences.append(plan_sequence_views(target_output_path, model_id_int, rotation_degree, steps))
+
+    # 6. Render (repeated orientations are linked; an atlas packs several views per call)
+    render_views(template, [view for seq in sequences for view in seq], view_cache, atlas, png_writer, timer)
+    template.reset_pivot()
+
+    # 7. Hand each finished sequence (+ rotation metadata) to the backend, then journal it
+    with timer.stage("finish"):
+        for (rotation_degree, sequence_key), seq in zip(angle_jobs, sequences):
+            output.finish(sequence_key, sequence_meta(seq, dataset="ShapeNet", model_id=model_id_str,
+                                                      rotation_degree=rotation_degree, sequence_rng=sequence_rng))
+            if journal is not None:
+                journal.mark_done(sequence_key)
 
 # -----------------------------------------------------------------------------
 # MAIN ENTRY POINT
@@ -207,63 +332,271 @@ if __name__ == "__main__":
     else:
         args = []
 
+    parser = argparse.ArgumentParser(
+        prog="blender -b -P ShapeNet_batch.py --",
+        description="Render ShapeNet rotation sequences for every model in directory.txt."
+    )
+    parser.add_argument("degrees", nargs="+",
+                        help="Rotation step(s) in degrees, e.g. 15 30 45 60 75")
+    parser.add_argument("--output-dir", default=BASE_OUTPUT_DIR,
+                        help="Root folder for renders (default: BASE_OUTPUT_DIR)")
+    parser.add_argument("--input-list", default=None,
+                        help=f"Model list, one category/model_id per line (default: ./{INPUT_FILE_NAME})")
+    add_dataset_arguments(parser, FILEPATH_NAME)
+    parser.add_argument("--output-format", choices=["dir", "tar"], default="dir",
+                        help="'dir': one PNG folder per sequence; 'tar': WebDataset tar shards + index")
+    parser.add_argument("--tar-shard-mb", type=float, default=1024,
+                        help="Size cap of one tar shard in MB (--output-format tar)")
+    parser.add_argument("--model-index", default=None,
+                        help="JSONL index from model_index.py (stored centroids, job sizes)")
+    parser.add_argument("--order", choices=["list", "longest-first"], default="list",
+                        help="Model order; 'longest-first' sorts by indexed face count before sharding")
+    parser.add_argument("--prefetch", type=int, default=0,
+                        help="Read the next N models on a background thread while rendering (0 = off)")
+    parser.add_argument("--prefetch-dir", default=None,
+                        help="Copy prefetched models here (e.g. /dev/shm/shapenet) instead of only warming the page cache")
+    parser.add_argument("--sequence-rng", choices=SEQUENCE_RNGS, default="hash",
+                        help="'hash': steps from a hash of (model, angle, step); 'legacy': model_id+angle seeded random")
+    parser.add_argument("--max-rss-mb", type=float, default=0,
+                        help="Restart Blender (same worker, resumes from the journal) once RSS exceeds this (0 = never)")
+    parser.add_argument("--quarantine", default=None,
+                        help="JSONL list of models that crashed/hung a worker (written by ShapeNet_pool.py); skipped")
+    parser.add_argument("--merge-parts", action="store_true",
+                        help="Join the imported parts into one mesh (one material slot per material)")
+    parser.add_argument("--loader", choices=["bpy", "native"], default="bpy",
+                        help="'bpy': Blender's OBJ importer; 'native': NumPy OBJ/MTL parser + foreach_set (geometry and Kd only)")
+    parser.add_argument("--shard-index", type=int, default=0,
+                        help="Index of the slice of directory.txt this worker renders")
+    parser.add_argument("--shard-count", type=int, default=1,
+                        help="Total number of slices directory.txt is split into")
+    parser.add_argument("--mesh-cache", default=None,
+                        help="Folder for the binary mesh cache (skips OBJ parsing on reruns)")
+    parser.add_argument("--journal", default=None,
+                        help="Completion journal folder (default: <output-dir>/.journal)")
+    parser.add_argument("--backfill-journal", action="store_true",
+                        help="Journal folders that already hold a full sequence (automatic while the journal is empty)")
+    parser.add_argument("--no-view-cache", action="store_true",
+                        help="Always render, even when an orientation was already rendered for the model")
+    parser.add_argument("--atlas-tiles", type=int, default=0,
+                        help="Render up to N views per render call as an orthographic atlas (0 = off)")
+    add_png_arguments(parser)
+    parser.add_argument("--render-border", action="store_true",
+                        help="Shade only the region the model's projected bounding box covers (same PNGs)")
+    parser.add_argument("--border-margin", type=int, default=4,
+                        help="Extra pixels around the projected box for --render-border")
+    parser.add_argument("--timing-log", default=None,
+                        help="Folder for per-model stage timings (JSONL, one file per worker)")
+    parser.add_argument("--verify-pose", action="store_true",
+                        help="Check the pose engine against the unparent/reset rotation on every model")
+
     if len(args) < 1:
         print("\n❌ Error: Missing Rotation Degree.")
-        print("Usage: blender -b -P script.py -- <DEGREE>")
+        print("Usage: blender -b -P script.py -- <DEGREE> [<DEGREE> ...] [--shard-index K --shard-count N]")
         sys.exit(1)
-    
+
+    options = parser.parse_args(args)
+
     try:
-        rotation_input = float(args[0])
+        rotation_inputs = [float(degree) for degree in options.degrees]
     except ValueError:
         print("❌ Error: Rotation degree must be a number.")
         sys.exit(1)
 
+    if options.shard_count < 1 or not (0 <= options.shard_index < options.shard_count):
+        print(f"❌ Error: Invalid shard {options.shard_index}/{options.shard_count}.")
+        sys.exit(1)
+
     # Define Batch Name based on rotation
-    if rotation_input.is_integer():
-        batch_name = str(int(rotation_input))
-    else:
-        batch_name = str(rotation_input)
+    batch_names = []
+    for rotation_input in rotation_inputs:
+        if rotation_input.is_integer():
+            batch_names.append(str(int(rotation_input)))
+        else:
+            batch_names.append(str(rotation_input))
 
     current_cwd = os.getcwd()
-    file_list_path = os.path.join(current_cwd, INPUT_FILE_NAME)
+    file_list_path = options.input_list or os.path.join(current_cwd, INPUT_FILE_NAME)
     
     if not os.path.exists(file_list_path):
-        print(f"❌ Error: '{INPUT_FILE_NAME}' not found in {current_cwd}")
+        print(f"❌ Error: '{file_list_path}' not found")
         sys.exit(1)
 
     with open(file_list_path, 'r') as f:
         lines = [line.strip() for line in f if line.strip()]
 
+    mesh_cache = MeshCache(options.mesh_cache) if options.mesh_cache else None
+
+    def cache_key_for(relative_path):
+        """Merged and split imports, and the two loaders, are cached separately."""
+        key = f"{relative_path}.merged" if options.merge_parts else relative_path
+        return f"{key}.native" if options.loader == "native" else key
+
+    journal_dir = options.journal or os.path.join(options.output_dir, ".journal")
+    writer_name = f"shapenet-{options.shard_index}-of-{options.shard_count}-{os.getpid()}{writer_suffix()}"
+    journal = CompletionJournal(journal_dir, writer_name)
+    output = open_output(options.output_format, options.output_dir, writer_name, options.tar_shard_mb)
+    timer = open_timer(options.timing_log, writer_name)
+    print(f"📒 Journal: {len(journal)} sequences already done ({journal_dir})")
+    # A first run over an existing tree must not clear finished folders
+    backfill = options.backfill_journal or journal.is_new
+    if backfill and not options.backfill_journal:
+        print("📒 Empty journal: finished folders are backfilled instead of re-rendered")
+
+    model_index = load_model_index(options.model_index)
+    if options.model_index:
+        print(f"🗂️  Model index: {len(model_index)} entries ({options.model_index})")
+    if options.order == "longest-first":
+        if not model_index:
+            print("❌ Error: --order longest-first needs --model-index.")
+            sys.exit(1)
+        # Largest first, so the long tail does not end up on one worker at the very end
+        lines.sort(key=lambda rel: job_cost(model_index.get(rel)), reverse=True)
+
+    # Strided slice so every shard gets a mix of categories (and of sizes)
+    lines = lines[options.shard_index::options.shard_count]
+
     total_models = len(lines)
-    print(f"🚀 Starting Batch: '{batch_name}' (Rotation: {rotation_input}°)")
+    print(f"🚀 Starting Batch: {', '.join(batch_names)} (Rotation: {', '.join(f'{r}°' for r in rotation_inputs)})")
+    if options.shard_count > 1:
+        print(f"🧩 Shard {options.shard_index + 1}/{options.shard_count}")
     print(f"📂 Found {total_models} models to process.\n")
 
+    # Camera, RotationPivot and render settings are built once for the whole run
+    setup_start = time.perf_counter()
+    template = SceneTemplate(CAMERA_DISTANCE, RESOLUTION, backface_culling=False)
+    if options.render_border:
+        template.enable_render_border(options.border_margin)
+    view_cache = None if options.no_view_cache else OrientationCache()
+    png_writer = setup_png_output(template.scene, options)
+    atlas = AtlasRenderer(template, options.atlas_tiles, png_writer=png_writer) if options.atlas_tiles > 1 else None
+    timer.event("setup", seconds=round(time.perf_counter() - setup_start, 4))
+
+    # Models that crashed or hung an earlier worker (same torn-line tolerant JSONL as the journal)
+    quarantined = set()
+    if options.quarantine:
+        quarantined = CompletionJournal.read_keys(options.quarantine)
+        if quarantined:
+            print(f"⛔ Quarantine: {len(quarantined)} models skipped ({options.quarantine})")
+
+    # Pass 1: journal lookups (in memory) decide which models still need work
+    queue = []
     for i, relative_path in enumerate(lines):
         parts = relative_path.split('/')
         if len(parts) < 2:
             continue
 
+        if relative_path in quarantined:
+            print(f"[{i+1}/{total_models}] ⛔ Quarantined, skipping: {parts[1]}")
+            continue
+
         folder_category = parts[0]
         subfolder_id = parts[1]
 
-        # Output Directory
-        target_output_dir = os.path.join(BASE_OUTPUT_DIR, batch_name, folder_category, subfolder_id)
+        # Sequence key per angle (= output folder / tar sample key); only angles without renders are queued
+        angle_jobs = []
+        for rotation_input, batch_name in zip(rotation_inputs, batch_names):
+            sequence_key = f"{batch_name}/{relative_path}"
 
-        # Skip if exists
-        if os.path.exists(target_output_dir) and os.path.isdir(target_output_dir):
-            if os.listdir(target_output_dir):
-                print(f"[{i+1}/{total_models}] ✅ Exists, skipping: {subfolder_id}")
+            # Skip if journaled as complete
+            if sequence_key in journal:
                 continue
-        
-        os.makedirs(target_output_dir, exist_ok=True)
 
-        # -------------------------------------------------------
-        # ORIGINAL PATH LOGIC RESTORED
-        # -------------------------------------------------------
-        obj_path = f'{FILEPATH_NAME}/.cache/huggingface/hub/datasets--ShapeNet--ShapeNetCore/blobs/{relative_path}/models/model_normalized.obj'
+            target_output_dir = os.path.join(options.output_dir, batch_name, folder_category, subfolder_id)
+            if backfill and count_renders(target_output_dir) >= SEQUENCE_LENGTH:
+                journal.mark_done(sequence_key, backfilled=True)
+                continue
 
-        print(f"[{i+1}/{total_models}] 🆕 Processing: {subfolder_id}")
-        
-        process_model(obj_path, target_output_dir, subfolder_id, rotation_input)
+            angle_jobs.append((rotation_input, sequence_key))
+
+        if not angle_jobs:
+            print(f"[{i+1}/{total_models}] ✅ Exists, skipping: {subfolder_id}")
+            continue
+
+        queue.append((i, relative_path, subfolder_id, angle_jobs))
+
+    # OBJ paths: one scan of the dataset (cached across runs); missing models are reported up front
+    resolver = resolver_from_options(options)
+    missing = set(resolver.resolve([job[1] for job in queue], options.rescan_dataset))
+    print(f"🗺️  Dataset: {resolver.summary()}")
+    if missing:
+        print(f"❌ {len(missing)} models missing from the dataset, e.g. {', '.join(sorted(missing)[:5])}")
+
+    pending_jobs = []
+    for i, relative_path, subfolder_id, angle_jobs in queue:
+        # A model still in the mesh cache renders without its OBJ
+        if relative_path in missing and not (mesh_cache and os.path.exists(mesh_cache.path_for(cache_key_for(relative_path)))):
+            print(f"[{i+1}/{total_models}] ❌ Missing, skipping: {subfolder_id}")
+            continue
+        pending_jobs.append((i, relative_path, subfolder_id, resolver.obj_path(relative_path) or "", angle_jobs))
+    queue = pending_jobs
+
+    # Pass 2: render; the prefetcher reads the next models while the current one renders
+    prefetcher = None
+    if options.prefetch > 0:
+        prefetcher = ModelPrefetcher(mesh_cache, options.prefetch_dir, options.prefetch, loader=options.loader)
+
+    memory_guard = MemoryGuard(options.max_rss_mb)
+    if restart_count():
+        print(f"♻️  Restart #{restart_count()}: resuming from the journal")
+
+    def close_run():
+        """Flushes everything a restart or the end of the run must leave on disk."""
+        if prefetcher:
+            prefetcher.close()
+        if png_writer:
+            png_writer.close()
+        output.close()
+        journal.close()
+        timer.close()
+
+    for n, (i, relative_path, subfolder_id, obj_path, angle_jobs) in enumerate(queue):
+        print(f"[{i+1}/{total_models}] 🆕 Processing: {subfolder_id} ({len(angle_jobs)} angles)")
+
+        # The indexed centroid is only trusted while the OBJ is the file that was indexed
+        index_entry = model_index.get(relative_path) or {}
+        center = index_entry.get("centroid")
+        if center is not None and index_entry.get("file_size") != os.path.getsize(obj_path):
+            center = None
+        timer.start(subfolder_id, key=relative_path, angles=[job[0] for job in angle_jobs])
+
+        prefetched = None
+        if prefetcher:
+            with timer.stage("prefetch_wait"):
+                prefetched = prefetcher.get(cache_key_for(relative_path), obj_path)
+            for _, next_path, _, next_obj, _ in queue[n + 1:n + 1 + prefetcher.depth]:
+                prefetcher.schedule(cache_key_for(next_path), next_obj)
+
+        # Markers let the supervisor (ShapeNet_pool.py) tell which model a crash or hang belongs to
+        print(f"@@MODEL_START {relative_path}", flush=True)
+        process_model(template, output, obj_path, angle_jobs, subfolder_id,
+                      mesh_cache=mesh_cache, cache_key=cache_key_for(relative_path), verify_pose=options.verify_pose,
+                      journal=journal, view_cache=view_cache, atlas=atlas, png_writer=png_writer, timer=timer,
+                      center=center, prefetched=prefetched, sequence_rng=options.sequence_rng,
+                      merge_parts=options.merge_parts, loader=options.loader)
+        print(f"@@MODEL_DONE {relative_path}", flush=True)
+
+        # Model boundary: purge orphan datablocks, sample RSS
+        over_limit = memory_guard.end_model(timer)
+        timer.finish()
+        if prefetcher:
+            prefetcher.release(prefetched)
+
+        if over_limit and n + 1 < len(queue):
+            close_run()
+            memory_guard.restart()
+
+    close_run()
+    if prefetcher:
+        print(f"\n📥 Prefetch: {prefetcher.bytes_read / 1024 ** 2:.0f} MB read ahead")
+    print(f"\n🧠 RSS: {memory_guard.start_rss_mb:.0f} MB at start, {memory_guard.last_rss_mb:.0f} MB at end")
+
+    if view_cache:
+        print(f"\n🔁 View cache: {view_cache.summary()}")
+
+    if atlas:
+        print(f"\n🧱 Atlas: {atlas.calls} render calls")
+
+    if mesh_cache:
+        print(f"\n💾 Mesh cache: {mesh_cache.hits} hits, {mesh_cache.misses} misses")
 
     print("\n🎉 Script execution completed.")
@@ -2,6 +2,7 @@ import bpy
 import math
 import random
 from mathutils import Matrix, Vector
+import numpy as np
 import sys
 import os  # Added for directory handling
 
@@ -55,20 +56,15 @@ def recalculate_normals(obj):
 
 def get_collection_center(collection):
     """Calculates the center of mass of all meshes in a collection."""
-    total_center = Vector((0, 0, 0))
-    total_vertices = 0
-    
+    chunks = []
     for obj in collection.objects:
         if obj.type == 'MESH':
-            world_matrix = obj.matrix_world
-            for v in obj.data.vertices:
-                world_v = world_matrix @ v.co
-                total_center += world_v
-                total_vertices += 1
-    
-    if total_vertices > 0:
-        return total_center / total_vertices
-    return Vector((0, 0, 0))
+            co = np.empty(len(obj.data.vertices) * 3, dtype=np.float32)
+            obj.data.vertices.foreach_get("co", co)
+            world_matrix = np.array(obj.matrix_world, dtype=np.float64)
+            chunks.append(co.reshape(-1, 3) @ world_matrix[:3, :3].T + world_matrix[:3, 3])
+    points = np.concatenate(chunks) if chunks else np.zeros((0, 3))
+    return Vector(points.mean(axis=0)) if len(points) else Vector((0, 0, 0))
 
 def rotate_around_origin(obj, axis_name, angle_radians):
     """
@@ -0,0 +1,273 @@
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+
+# -----------------------------------------------------------------------------
+# CONFIGURATION
+# -----------------------------------------------------------------------------
+# Path to your Blender executable
+BLENDER_PATH = "/Applications/Blender.app/Contents/MacOS/Blender"
+
+# Worker script (must accept --shard-index / --shard-count / --quarantine)
+SCRIPT_PATH = "ShapeNet_batch.py"
+
+# Models that crashed or hung a worker; later runs skip them
+QUARANTINE_FILE = "quarantine.jsonl"
+
+# Worker progress lines look like "[12/281] 🆕 Processing: <model_id>"
+PROGRESS_PATTERN = re.compile(r"^\[(\d+)/(\d+)\]")
+
+# Marker lines around every model ("@@MODEL_START 02747177/<model_id>")
+MARKER_PATTERN = re.compile(r"^@@MODEL_(START|DONE) (\S+)")
+
+# A worker that fails this many times in a row without finishing a model is given up
+MAX_FAILURES_WITHOUT_PROGRESS = 3
+
+# A model that ends its worker with an exit code (Python error) this many times is quarantined;
+# crashes (signals) and timeouts quarantine it right away
+MAX_ERRORS_PER_MODEL = 2
+
+# -----------------------------------------------------------------------------
+# HELPER FUNCTIONS
+# -----------------------------------------------------------------------------
+
+class ProgressBoard:
+    """Merges the per-worker '[i/total]' counters into one overall count."""
+
+    def __init__(self, worker_count):
+        self.lock = threading.Lock()
+        self.done = [0] * worker_count
+        self.totals = [0] * worker_count
+        self.start_time = time.time()
+
+    def update(self, worker, done, total):
+        with self.lock:
+            self.done[worker] = done
+            self.totals[worker] = total
+            return sum(self.done), sum(self.totals)
+
+    def rate(self):
+        elapsed = max(time.time() - self.start_time, 1e-6)
+        return sum(self.done) / elapsed * 3600.0
+
+
+class WorkerSlot:
+    """One shard's Blender process, the model it is on, and its restart history."""
+
+    def __init__(self, worker):
+        self.worker = worker
+        self.process = None
+        self.pump = None
+        self.lock = threading.Lock()
+        self.current = None        # relative_path between START and DONE markers
+        self.started = 0.0
+        self.kill_reason = None
+        self.restarts = 0
+        self.failures_without_progress = 0
+        self.errors = {}           # relative_path -> non-zero exits while it was running
+        self.finished = False
+        self.failed = False
+
+    def model_started(self, relative_path):
+        with self.lock:
+            self.current = relative_path
+            self.started = time.time()
+
+    def model_done(self):
+        with self.lock:
+            self.current = None
+            self.failures_without_progress = 0
+
+
+def append_quarantine(path, relative_path, reason, worker):
+    with open(path, "a") as f:
+        f.write(json.dumps({"key": relative_path, "reason": reason, "worker": worker,
+                            "time": round(time.time(), 3)}) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def build_worker_command(options, worker):
+    return [
+        # Without --python-exit-code an unhandled exception in the script still exits 0
+        options.blender, "-b", "-t", str(options.threads), "--python-exit-code", "1",
+        "-P", options.script, "--",
+        *options.worker_args,
+        "--shard-index", str(worker),
+        "--shard-count", str(options.workers),
+        "--quarantine", options.quarantine,
+    ]
+
+
+def pump_output(slot, process, log_path, board):
+    """Copies one worker's stdout to its log file, tracks its current model and reports progress."""
+    with open(log_path, "a") as log:
+        for line in process.stdout:
+            log.write(line)
+            log.flush()
+
+            marker = MARKER_PATTERN.match(line)
+            if marker:
+                if marker.group(1) == "START":
+                    slot.model_started(marker.group(2))
+                else:
+                    slot.model_done()
+                continue
+
+            match = PROGRESS_PATTERN.match(line)
+            if match:
+                done, total = board.update(slot.worker, int(match.group(1)), int(match.group(2)))
+                print(f"[{done}/{total}] worker {slot.worker}: {line[match.end():].strip()}")
+            elif "❌" in line:
+                print(f"worker {slot.worker}: {line.rstrip()}")
+
+
+def start_worker(options, slot, board):
+    log_path = os.path.join(options.log_dir, f"worker_{slot.worker}.log")
+    with open(log_path, "a") as log:
+        log.write(f"===== start #{slot.restarts} at {time.strftime('%Y-%m-%d %H:%M:%S')} =====\n")
+
+    slot.current = None
+    slot.kill_reason = None
+    slot.process = subprocess.Popen(
+        build_worker_command(options, slot.worker),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        bufsize=1,
+        env=dict(os.environ, PYTHONUNBUFFERED="1"),
+    )
+    slot.pump = threading.Thread(target=pump_output, args=(slot, slot.process, log_path, board), daemon=True)
+    slot.pump.start()
+
+
+def supervise(options, slots, board):
+    """
+    Polls the workers: a model running longer than --model-timeout gets its
+    worker killed. A worker that crashes or is killed in the middle of a model
+    gets that model quarantined; a Python error (non-zero exit) quarantines it
+    only on the second occurrence. The worker is restarted either way; the new
+    process resumes from the journal and skips everything quarantined.
+    """
+    while not all(slot.finished for slot in slots):
+        time.sleep(1.0)
+        for slot in slots:
+            if slot.finished:
+                continue
+
+            with slot.lock:
+                current, started = slot.current, slot.started
+            if (options.model_timeout and current and slot.kill_reason is None
+                    and time.time() - started > options.model_timeout):
+                slot.kill_reason = f"timeout after {options.model_timeout:.0f}s"
+                print(f"⏱️  worker {slot.worker}: {current} hung, killing")
+                slot.process.kill()
+
+            returncode = slot.process.poll()
+            if returncode is None:
+                continue
+            slot.pump.join()
+
+            if returncode == 0:
+                slot.finished = True
+                continue
+
+            # A crash or hang is blamed on the model right away. An exit code (Python error) may
+            # be the environment (full disk, lost mount): it counts as a failure without progress
+            # and quarantines the model only when the same model fails that way again
+            failure = slot.current if returncode < 0 or slot.kill_reason else None
+            if returncode > 0 and not slot.kill_reason:
+                slot.failures_without_progress += 1
+                if slot.current:
+                    slot.errors[slot.current] = slot.errors.get(slot.current, 0) + 1
+                    if slot.errors[slot.current] >= MAX_ERRORS_PER_MODEL:
+                        failure = slot.current
+            elif not slot.current:
+                slot.failures_without_progress += 1
+            if failure:
+                reason = slot.kill_reason or (f"signal {-returncode}" if returncode < 0 else f"exit code {returncode}")
+                append_quarantine(options.quarantine, failure, reason, slot.worker)
+                print(f"❌ worker {slot.worker}: quarantined {failure} ({reason})")
+
+            if (slot.restarts >= options.max_restarts
+                    or slot.failures_without_progress >= MAX_FAILURES_WITHOUT_PROGRESS):
+                print(f"❌ worker {slot.worker}: giving up after {slot.restarts} restarts")
+                slot.finished = slot.failed = True
+                continue
+
+            slot.restarts += 1
+            print(f"🔁 worker {slot.worker}: restarting (#{slot.restarts})")
+            start_worker(options, slot, board)
+
+# -----------------------------------------------------------------------------
+# MAIN ENTRY POINT
+# -----------------------------------------------------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Run N background Blender workers, each rendering a slice of directory.txt.",
+        epilog="Example: python3 ShapeNet_pool.py --workers 32 -- 15"
+    )
+    parser.add_argument("--blender", default=BLENDER_PATH, help="Blender executable")
+    parser.add_argument("--script", default=SCRIPT_PATH, help="Worker script run with -P")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Number of Blender processes (default: one per core)")
+    parser.add_argument("--threads", type=int, default=1,
+                        help="Threads per Blender process (passed as -t)")
+    parser.add_argument("--log-dir", default="logs", help="Folder for per-worker logs")
+    parser.add_argument("--model-timeout", type=float, default=900,
+                        help="Seconds one model may take before its worker is killed (0 = no limit)")
+    parser.add_argument("--max-restarts", type=int, default=100,
+                        help="Restarts per worker before it is given up")
+    parser.add_argument("--quarantine", default=QUARANTINE_FILE,
+                        help="JSONL list of models that crashed/hung a worker (skipped by every run)")
+    parser.add_argument("worker_args", nargs=argparse.REMAINDER,
+                        help="Arguments after '--' are forwarded to every worker")
+
+    options = parser.parse_args()
+    if options.worker_args and options.worker_args[0] == "--":
+        options.worker_args = options.worker_args[1:]
+
+    if not options.worker_args:
+        print("❌ Error: Missing worker arguments.")
+        print("Usage: python3 ShapeNet_pool.py [--workers N] -- <DEGREE> [worker options]")
+        sys.exit(1)
+
+    if options.workers < 1:
+        print("❌ Error: --workers must be at least 1.")
+        sys.exit(1)
+
+    os.makedirs(options.log_dir, exist_ok=True)
+    options.quarantine = os.path.abspath(options.quarantine)
+    board = ProgressBoard(options.workers)
+
+    print(f"🚀 Launching {options.workers} Blender workers: {' '.join(options.worker_args)}")
+
+    slots = [WorkerSlot(worker) for worker in range(options.workers)]
+    for slot in slots:
+        start_worker(options, slot, board)
+
+    try:
+        supervise(options, slots, board)
+    except KeyboardInterrupt:
+        print("\n⛔ Interrupted, stopping workers...")
+        for slot in slots:
+            if slot.process.poll() is None:
+                slot.process.terminate()
+        sys.exit(1)
+
+    print(f"\n📈 Throughput: {board.rate():.0f} models/hour across {options.workers} workers")
+    restarts = sum(slot.restarts for slot in slots)
+    if restarts:
+        print(f"🔁 {restarts} worker restarts, quarantine: {options.quarantine}")
+
+    failed = [slot.worker for slot in slots if slot.failed]
+    if failed:
+        print(f"❌ Workers failed: {failed} (see {options.log_dir}/worker_<N>.log)")
+        sys.exit(1)
+
+    print("🎉 All workers finished.")
@@ -0,0 +1,158 @@
+import bpy
+import math
+import numpy as np
+import os
+import tempfile
+from mathutils import Matrix
+
+from png_writer import to_display, write_png, zlib_level
+
+# -----------------------------------------------------------------------------
+# HELPER FUNCTIONS
+# -----------------------------------------------------------------------------
+
+def grid_shape(count):
+    """(cols, rows) of the smallest near-square grid holding count tiles."""
+    cols = max(1, math.ceil(math.sqrt(count)))
+    rows = max(1, math.ceil(count / cols))
+    return cols, rows
+
+# -----------------------------------------------------------------------------
+# ATLAS RENDERER
+# -----------------------------------------------------------------------------
+
+class AtlasRenderer:
+    """
+    Renders up to `capacity` views of the model in ONE bpy.ops.render.render call.
+
+    Every view is a linked duplicate: an empty instancing the template's model
+    collection, posed with that view's pivot matrix and moved to its grid cell.
+    An orthographic camera sized so one cell spans exactly the perspective
+    camera's field of view at the origin looks at the grid; the result is
+    sliced back into the usual per-view PNGs. Cells are separated by a gap so
+    parts poking out of the frame are cropped like in the perspective render.
+
+    NOTE: the projection is orthographic, so tiles are close to but not
+    pixel-identical with the per-view perspective renders.
+
+    With an AsyncPngWriter the atlas is taken from the Viewer Node instead of
+    a temporary PNG, and the tiles are encoded on its threads. Otherwise the
+    tiles are encoded from the temporary PNG with the scene's bit depth, color
+    mode and compression.
+    """
+
+    def __init__(self, template, capacity, gap_fraction=0.25, png_writer=None):
+        self.template = template
+        self.capacity = capacity
+        self.png_writer = png_writer
+        scene = template.scene
+        self.tile_px = scene.render.resolution_x
+        self.gap_px = int(self.tile_px * gap_fraction)
+
+        # Width of the perspective frustum at the origin = one tile in world units
+        camera = template.camera
+        distance = camera.location.length
+        self.tile_size = 2.0 * distance * math.tan(camera.data.angle / 2.0)
+
+        cam_data = bpy.data.cameras.new("AtlasCamera")
+        cam_data.type = 'ORTHO'
+        cam_data.clip_start = camera.data.clip_start
+        cam_data.clip_end = camera.data.clip_end
+        self.camera = bpy.data.objects.new("AtlasCamera", cam_data)
+        scene.collection.objects.link(self.camera)
+        self.camera.matrix_world = camera.matrix_world.copy()
+        template.keep(self.camera)
+
+        self.instances = []
+        for i in range(capacity):
+            inst = bpy.data.objects.new(f"AtlasInstance.{i:03d}", None)
+            inst.instance_type = 'COLLECTION'
+            inst.instance_collection = template.collection
+            inst.hide_render = True
+            scene.collection.objects.link(inst)
+            template.keep(inst)
+            self.instances.append(inst)
+
+        self.tmp_dir = tempfile.mkdtemp(prefix="atlas_")
+        self.calls = 0
+
+    def render(self, views):
+        """Renders (pivot_pose, filepath) views, `capacity` per render call."""
+        for start in range(0, len(views), self.capacity):
+            self._render_chunk(views[start:start + self.capacity])
+
+    def _render_chunk(self, views):
+        if not views:
+            return
+
+        scene = self.template.scene
+        cols, rows = grid_shape(len(views))
+        tile, gap = self.tile_px, self.gap_px
+        width = cols * tile + (cols - 1) * gap
+        height = rows * tile + (rows - 1) * gap
+        pitch = self.tile_size * (tile + gap) / tile
+
+        # 1. Pose the linked duplicates on the grid (row 0 at the top)
+        for i, inst in enumerate(self.instances):
+            if i >= len(views):
+                inst.hide_render = True
+                continue
+            col, row = i % cols, i // cols
+            offset = Matrix.Translation(((col - (cols - 1) / 2) * pitch, 0.0, ((rows - 1) / 2 - row) * pitch))
+            inst.matrix_world = offset @ views[i][0]
+            inst.hide_render = False
+
+        # 2. Hide the source model (only the instances render) and swap camera/resolution
+        layer_collection = bpy.context.view_layer.layer_collection.children[self.template.collection.name]
+        saved = (scene.camera, scene.render.resolution_x, scene.render.resolution_y, scene.render.filepath,
+                 scene.render.use_border)
+        self.template.reset_pivot()
+        scene.render.use_border = False
+        layer_collection.exclude = True
+        self.camera.data.ortho_scale = self.tile_size * max(width, height) / tile
+        scene.camera = self.camera
+        scene.render.resolution_x = width
+        scene.render.resolution_y = height
+        scene.render.filepath = os.path.join(self.tmp_dir, "atlas.png")
+
+        try:
+            if self.png_writer:
+                bpy.ops.render.render()
+                pixels = self.png_writer.grab()
+            else:
+                bpy.ops.render.render(write_still=True)
+            self.calls += 1
+        finally:
+            (scene.camera, scene.render.resolution_x, scene.render.resolution_y, scene.render.filepath,
+             scene.render.use_border) = saved
+            layer_collection.exclude = False
+            for inst in self.instances:
+                inst.hide_render = True
+
+        # 3. Slice into per-view PNGs
+        if not self.png_writer:
+            atlas_image = bpy.data.images.load(os.path.join(self.tmp_dir, "atlas.png"))
+            try:
+                # Raw file values: 16-bit PNGs load as float, which would be linearized and premultiplied
+                atlas_image.colorspace_settings.name = 'Non-Color'
+                atlas_image.alpha_mode = 'CHANNEL_PACKED'
+                pixels = np.empty(width * height * 4, dtype=np.float32)
+                atlas_image.pixels.foreach_get(pixels)
+            finally:
+                bpy.data.images.remove(atlas_image)
+            pixels = pixels.reshape(height, width, 4)  # Blender rows are bottom-up
+
+        for i, (_, filepath) in enumerate(views):
+            col, row = i % cols, i // cols
+            x0 = col * (tile + gap)
+            y1 = height - row * (tile + gap)
+            if self.png_writer:
+                self.png_writer.submit(pixels[y1 - tile:y1, x0:x0 + tile], filepath)
+            else:
+                self._save_tile(pixels[y1 - tile:y1, x0:x0 + tile], filepath)
+
+    def _save_tile(self, tile_pixels, filepath):
+        """Writes one tile of the loaded atlas (display-encoded values) with the scene's PNG settings."""
+        settings = self.template.scene.render.image_settings
+        image = to_display(tile_pixels, int(settings.color_depth), settings.color_mode, linear=False)
+        write_png(image, filepath, zlib_level(settings.compression))
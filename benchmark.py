@@ -0,0 +1,300 @@
+import argparse
+import glob
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import time
+
+# -----------------------------------------------------------------------------
+# CONFIGURATION
+# -----------------------------------------------------------------------------
+# Path to your Blender executable
+BLENDER_PATH = "/Applications/Blender.app/Contents/MacOS/Blender"
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Fixed workloads. OBJ workloads are generated procedurally (same files on every
+# machine); faces are per object. The ShapeGen workload is a pinned seed range.
+WORKLOADS = {
+    "obj-small": {"kind": "obj", "models": 8, "objects": 1, "faces": 2000},
+    "obj-large": {"kind": "obj", "models": 2, "objects": 1, "faces": 200000},
+    "obj-many-objects": {"kind": "obj", "models": 4, "objects": 150, "faces": 600},
+    "shapegen-pinned": {"kind": "shapegen", "amounts": [1, 5], "seeds": [0, 1, 2]},
+}
+ANGLES = ["15", "30"]
+
+# -----------------------------------------------------------------------------
+# SYNTHETIC MODELS
+# -----------------------------------------------------------------------------
+
+def write_sphere(f, vertex_offset, center, radius, faces):
+    """Appends a UV sphere with about `faces` quads/triangles; returns the new vertex offset."""
+    rings = max(3, int(math.sqrt(faces / 2)))
+    segments = 2 * rings
+    f.write(f"v {center[0]:.6f} {center[1]:.6f} {center[2] + radius:.6f}\n")
+    for r in range(1, rings):
+        theta = math.pi * r / rings
+        for s in range(segments):
+            phi = 2 * math.pi * s / segments
+            f.write(f"v {center[0] + radius * math.sin(theta) * math.cos(phi):.6f} "
+                    f"{center[1] + radius * math.sin(theta) * math.sin(phi):.6f} "
+                    f"{center[2] + radius * math.cos(theta):.6f}\n")
+    f.write(f"v {center[0]:.6f} {center[1]:.6f} {center[2] - radius:.6f}\n")
+
+    top, bottom = vertex_offset + 1, vertex_offset + 2 + (rings - 1) * segments
+    ring = lambda r, s: vertex_offset + 2 + r * segments + s % segments
+    for s in range(segments):
+        f.write(f"f {top} {ring(0, s)} {ring(0, s + 1)}\n")
+    for r in range(rings - 2):
+        for s in range(segments):
+            f.write(f"f {ring(r, s)} {ring(r + 1, s)} {ring(r + 1, s + 1)} {ring(r, s + 1)}\n")
+    for s in range(segments):
+        f.write(f"f {ring(rings - 2, s + 1)} {ring(rings - 2, s)} {bottom}\n")
+    return bottom
+
+
+def generate_obj_models(folder, name, spec):
+    """Writes <folder>/<category>/<id>/model.obj (+ .mtl) and a matching directory.txt."""
+    rng = random.Random(name)
+    category = f"bench-{name}"
+    entries = []
+    for m in range(spec["models"]):
+        model_id = f"{rng.getrandbits(48):012x}"
+        model_dir = os.path.join(folder, category, model_id)
+        os.makedirs(model_dir, exist_ok=True)
+
+        with open(os.path.join(model_dir, "model.mtl"), "w") as mtl:
+            for k in range(4):
+                mtl.write(f"newmtl mat{k}\nKd {rng.random():.3f} {rng.random():.3f} {rng.random():.3f}\n\n")
+
+        with open(os.path.join(model_dir, "model.obj"), "w") as f:
+            f.write("mtllib model.mtl\n")
+            offset = 0
+            for o in range(spec["objects"]):
+                f.write(f"o part{o}\nusemtl mat{o % 4}\n")
+                center = [rng.uniform(-0.5, 0.5) for _ in range(3)]
+                offset = write_sphere(f, offset, center, rng.uniform(0.05, 0.3), spec["faces"])
+        entries.append(f"{category}/{model_id}")
+
+    list_path = os.path.join(folder, "directory.txt")
+    with open(list_path, "w") as f:
+        f.write("\n".join(entries) + "\n")
+    return list_path
+
+# -----------------------------------------------------------------------------
+# RUNNING
+# -----------------------------------------------------------------------------
+
+def workload_command(options, name, spec, work_dir, out_dir, timing_dir):
+    common = ["--output-dir", out_dir, "--timing-log", timing_dir, *options.extra_args]
+    if spec["kind"] == "obj":
+        models_dir = os.path.join(work_dir, "models", name)
+        list_path = os.path.join(models_dir, "directory.txt")
+        if not os.path.exists(list_path):
+            list_path = generate_obj_models(models_dir, name, spec)
+        script = os.path.join(SCRIPT_DIR, "ShapeNet_batch.py")
+        args = [*ANGLES, "--input-list", list_path,
+                "--obj-template", os.path.join(models_dir, "{relative_path}", "model.obj"),
+                # Own path cache: the default one in the current directory belongs to the real dataset
+                "--dataset-cache", os.path.join(models_dir, ".dataset_paths.json"),
+                "--loader", options.loader, *common]
+    else:
+        script = os.path.join(SCRIPT_DIR, "ShapeGen_batch.py")
+        args = [*ANGLES, "--amounts", *map(str, spec["amounts"]), "--seeds", *map(str, spec["seeds"]),
+                "--no-mesh-cache", *common]
+    # Without --python-exit-code an unhandled exception in the script still exits 0
+    return [options.blender, "-b", "-t", str(options.threads), "--python-exit-code", "1",
+            "-P", script, "--", *args]
+
+
+def count_images(out_dir):
+    """PNG files plus PNG members listed in tar shard indexes."""
+    count = len(glob.glob(os.path.join(out_dir, "**", "*.png"), recursive=True))
+    for index_path in glob.glob(os.path.join(out_dir, "shards", "*.index.jsonl")):
+        with open(index_path) as f:
+            for line in f:
+                count += sum(m["name"].endswith(".png") for m in json.loads(line)["members"])
+    return count
+
+
+def summarize_timings(timing_dir):
+    """Per-stage mean seconds per model, setup time, peak RSS and ShapeGen rebuilds from the StageTimer logs."""
+    stages, models, setup, peak_rss = {}, 0, 0.0, 0.0
+    regenerations = []
+    for path in glob.glob(os.path.join(timing_dir, "*.jsonl")):
+        with open(path) as f:
+            for line in f:
+                record = json.loads(line)
+                peak_rss = max(peak_rss, record.get("peak_rss_mb", 0.0))
+                if record.get("event") == "setup":
+                    setup += record["seconds"]
+                    continue
+                models += 1
+                if "regenerations" in record:
+                    regenerations.append(record["regenerations"])
+                for stage, seconds in record["stages"].items():
+                    stages[stage] = stages.get(stage, 0.0) + seconds
+    per_model = {stage: round(total / models, 4) for stage, total in sorted(stages.items())} if models else {}
+    summary = {"models": models, "setup_seconds": round(setup, 4), "stage_seconds_per_model": per_model,
+               "peak_rss_mb": peak_rss}
+    if regenerations:
+        summary["regenerations_per_shape"] = round(sum(regenerations) / len(regenerations), 2)
+    return summary
+
+
+def run_workload(options, name, spec, work_dir):
+    """Runs the workload `repeat` times from a clean output folder; keeps the fastest successful run."""
+    results = []
+    for attempt in range(options.repeat):
+        out_dir = os.path.join(work_dir, "out", name)
+        timing_dir = os.path.join(work_dir, "timing", name)
+        shutil.rmtree(out_dir, ignore_errors=True)
+        shutil.rmtree(timing_dir, ignore_errors=True)
+
+        command = workload_command(options, name, spec, work_dir, out_dir, timing_dir)
+        log_path = os.path.join(work_dir, f"{name}.log")
+        start = time.perf_counter()
+        with open(log_path, "w") as log:
+            returncode = subprocess.call(command, stdout=log, stderr=subprocess.STDOUT)
+        seconds = time.perf_counter() - start
+
+        images = count_images(out_dir)
+        result = dict(summarize_timings(timing_dir), seconds=round(seconds, 3), images=images,
+                      images_per_sec=round(images / seconds, 3) if seconds > 0 else 0.0,
+                      returncode=returncode)
+        print(f"  {name} run {attempt + 1}/{options.repeat}: {images} images in {seconds:.1f}s "
+              f"({result['images_per_sec']:.2f} img/s, peak {result['peak_rss_mb']:.0f} MB)"
+              + ("" if returncode == 0 else f" ❌ exit {returncode}, see {log_path}"))
+        results.append(result)
+    # A successful run always beats a failed one, whatever their times
+    return min(results, key=lambda result: (result["returncode"] != 0, result["seconds"]))
+
+
+def compare_bakes(options, work_dir):
+    """Bakes the shapegen-pinned seeds with both ShapeGen bake configs; returns the comparison report."""
+    spec = WORKLOADS["shapegen-pinned"]
+    report_path = os.path.join(work_dir, "bake_comparison.json")
+    log_path = os.path.join(work_dir, "bake_comparison.log")
+    if os.path.exists(report_path):
+        os.remove(report_path)
+    command = [options.blender, "-b", "-t", str(options.threads), "--python-exit-code", "1",
+               "-P", os.path.join(SCRIPT_DIR, "ShapeGen_batch.py"), "--",
+               "--amounts", *map(str, spec["amounts"]), "--seeds", *map(str, spec["seeds"]),
+               "--compare-bakes", report_path]
+    with open(log_path, "w") as log:
+        returncode = subprocess.call(command, stdout=log, stderr=subprocess.STDOUT)
+
+    report = {"match": False, "mismatched": []}
+    if os.path.exists(report_path):
+        with open(report_path) as f:
+            report = json.load(f)
+    report["returncode"] = returncode
+    for entry in report["mismatched"]:
+        print(f"  {entry['amount']}/{entry['seed']}: {entry['reason']}")
+    print(f"  bake comparison: {'✅ batched matches legacy' if report['match'] else f'❌ differs, see {log_path}'}")
+    return report
+
+
+def environment_info(options):
+    info = {"host": platform.node(), "platform": platform.platform(), "cpu_count": os.cpu_count(),
+            "threads": options.threads, "loader": options.loader, "extra_args": options.extra_args,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S")}
+    try:
+        info["blender"] = subprocess.run([options.blender, "-b", "--version"], capture_output=True,
+                                         text=True).stdout.splitlines()[0]
+    except (OSError, IndexError):
+        info["blender"] = "unknown"
+    try:
+        info["git"] = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=SCRIPT_DIR,
+                                     capture_output=True, text=True).stdout.strip()
+    except OSError:
+        pass
+    return info
+
+# -----------------------------------------------------------------------------
+# BASELINE COMPARISON
+# -----------------------------------------------------------------------------
+
+def compare(results, baseline, tolerance):
+    """Prints throughput/memory deltas per workload; returns the names that regressed."""
+    regressions = []
+    print(f"\n{'workload':<20} {'img/s':>9} {'baseline':>9} {'delta':>8} {'RSS MB':>8} {'baseline':>9}")
+    for name, result in results["workloads"].items():
+        old = baseline.get("workloads", {}).get(name)
+        if not old or not old.get("images_per_sec"):
+            print(f"{name:<20} {result['images_per_sec']:>9.2f} {'-':>9}")
+            continue
+        delta = result["images_per_sec"] / old["images_per_sec"] - 1.0
+        flag = ""
+        if delta < -tolerance:
+            flag = " ❌ slower"
+            regressions.append(name)
+        elif old.get("peak_rss_mb") and result["peak_rss_mb"] > old["peak_rss_mb"] * (1.0 + tolerance):
+            flag = " ⚠️ more memory"
+        print(f"{name:<20} {result['images_per_sec']:>9.2f} {old['images_per_sec']:>9.2f} {delta:>+8.1%} "
+              f"{result['peak_rss_mb']:>8.0f} {old.get('peak_rss_mb', 0):>9.0f}{flag}")
+    return regressions
+
+# -----------------------------------------------------------------------------
+# MAIN ENTRY POINT
+# -----------------------------------------------------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the ShapeNet/ShapeGen render pipelines on fixed workloads.",
+        epilog="Example: python3 benchmark.py --output bench.json --baseline baseline.json -- --atlas-tiles 8"
+    )
+    parser.add_argument("--blender", default=BLENDER_PATH, help="Blender executable")
+    parser.add_argument("--threads", type=int, default=1, help="Threads per Blender process (passed as -t)")
+    parser.add_argument("--work-dir", default="bench", help="Generated models, renders, logs")
+    parser.add_argument("--workloads", nargs="+", choices=sorted(WORKLOADS), default=sorted(WORKLOADS),
+                        help="Subset of workloads to run")
+    parser.add_argument("--loader", choices=["bpy", "native"], default="bpy",
+                        help="OBJ loader of the obj-* workloads (ShapeNet_batch.py --loader)")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per workload (fastest is kept)")
+    parser.add_argument("--compare-bakes", action="store_true",
+                        help="Also check that ShapeGen's batched bake config produces the legacy meshes "
+                             "(shapegen-pinned seeds); a difference fails the run")
+    parser.add_argument("--output", default=None, help="Write the results JSON here")
+    parser.add_argument("--baseline", default=None, help="Results JSON of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="Relative throughput drop that counts as a regression (default: 0.10)")
+    parser.add_argument("extra_args", nargs=argparse.REMAINDER,
+                        help="Arguments after '--' are passed to every batch script run")
+
+    options = parser.parse_args()
+    if options.extra_args and options.extra_args[0] == "--":
+        options.extra_args = options.extra_args[1:]
+
+    work_dir = os.path.abspath(options.work_dir)
+    os.makedirs(work_dir, exist_ok=True)
+
+    results = {"environment": environment_info(options), "workloads": {}}
+    print(f"🚀 Benchmark ({results['environment']['blender']}), work dir {work_dir}")
+    for name in options.workloads:
+        results["workloads"][name] = run_workload(options, name, WORKLOADS[name], work_dir)
+    if options.compare_bakes:
+        results["bake_comparison"] = compare_bakes(options, work_dir)
+
+    if options.output:
+        with open(options.output, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"\n💾 Results: {options.output}")
+
+    failed = [name for name, result in results["workloads"].items() if result["returncode"] != 0]
+    regressions = []
+    if options.baseline:
+        with open(options.baseline) as f:
+            regressions = compare(results, json.load(f), options.tolerance)
+
+    if options.compare_bakes and not results["bake_comparison"]["match"]:
+        failed.append("bake-comparison")
+    if failed:
+        print(f"\n❌ Workloads failed: {failed}")
+    if regressions:
+        print(f"\n❌ Regressions beyond {options.tolerance:.0%}: {regressions}")
+    sys.exit(1 if failed or regressions else 0)
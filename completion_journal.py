@@ -0,0 +1,94 @@
+import glob
+import json
+import os
+import time
+
+# -----------------------------------------------------------------------------
+# COMPLETION JOURNAL
+# -----------------------------------------------------------------------------
+
+class CompletionJournal:
+    """
+    Append-only record of finished work units (one JSON object per line).
+
+    The journal is a folder: every process appends to its own
+    '<writer_name>.jsonl' file, so parallel workers never interleave writes,
+    and loading reads all of them into one in-memory set. A unit is only
+    written after all of its renders are on disk, so anything missing from
+    the set (including half-rendered folders from a crash) is simply redone.
+
+    `is_new` is True while no unit has been rendered yet (only backfilled
+    ones, e.g. by a sibling worker that started first): on a first run over
+    an existing tree, callers backfill folders that already hold a full
+    sequence instead of clearing and re-rendering them.
+    """
+
+    def __init__(self, folder, writer_name=None):
+        self.folder = folder
+        self.done = set()
+        os.makedirs(folder, exist_ok=True)
+
+        rendered = 0
+        for path in glob.glob(os.path.join(folder, "*.jsonl")):
+            for record in self.read_records(path):
+                self.done.add(record["key"])
+                rendered += not record.get("backfilled")
+        self.is_new = rendered == 0
+
+        writer_name = writer_name or f"journal-{os.getpid()}"
+        self._file = open(os.path.join(folder, f"{writer_name}.jsonl"), "a")
+
+    @staticmethod
+    def read_records(path):
+        """Records of one JSONL file that have a key (none if it does not exist)."""
+        if not os.path.exists(path):
+            return
+        with open(path, "r") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    record["key"]
+                except (ValueError, KeyError, TypeError):
+                    # Torn last line from a crash: that unit is not done
+                    continue
+                yield record
+
+    @staticmethod
+    def read_keys(path):
+        """Keys of one JSONL file (empty if it does not exist)."""
+        return {record["key"] for record in CompletionJournal.read_records(path)}
+
+    def __contains__(self, key):
+        return key in self.done
+
+    def __len__(self):
+        return len(self.done)
+
+    def mark_done(self, key, **info):
+        record = {"key": key, "time": round(time.time(), 3)}
+        record.update(info)
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.done.add(key)
+
+    def close(self):
+        self._file.close()
+
+# -----------------------------------------------------------------------------
+# HELPER FUNCTIONS
+# -----------------------------------------------------------------------------
+
+def count_renders(folder):
+    """Number of PNGs in folder (0 if it does not exist)."""
+    if not os.path.isdir(folder):
+        return 0
+    return sum(1 for name in os.listdir(folder) if name.endswith(".png"))
+
+def clear_partial_output(folder):
+    """Removes PNGs left by an interrupted run before the unit is re-rendered."""
+    if not os.path.isdir(folder):
+        return
+    for name in os.listdir(folder):
+        if name.endswith((".png", ".png.tmp")):
+            os.remove(os.path.join(folder, name))
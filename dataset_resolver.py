@@ -0,0 +1,171 @@
+import glob
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# -----------------------------------------------------------------------------
+# CONFIGURATION
+# -----------------------------------------------------------------------------
+HF_REPO = ".cache/huggingface/hub/datasets--ShapeNet--ShapeNetCore"
+
+# Folders that hold '<category>/<model_id>/' per layout ({root} = dataset root)
+LAYOUTS = {
+    "hf-blobs": "{root}/" + HF_REPO + "/blobs",
+    "hf-snapshots": "{root}/" + HF_REPO + "/snapshots/*",   # every revision, newest first
+    "extracted": "{root}",                                  # ShapeNetCore.v2 zip(s) unpacked into root
+}
+MODEL_FILE = os.path.join("models", "model_normalized.obj")
+
+# -----------------------------------------------------------------------------
+# RESOLVER
+# -----------------------------------------------------------------------------
+
+class DatasetResolver:
+    """
+    Maps directory.txt entries ('category/model_id') to absolute OBJ/MTL paths.
+
+    The first resolve() lists every needed category folder once and checks the
+    model folders on a thread pool (one listdir each, which sees OBJ and MTL
+    together). Found entries are kept in a JSON cache, so later starts do no
+    filesystem work for them. Missing entries are re-checked on every start.
+    With layout 'template', obj_template ('{root}', '{relative_path}') gives
+    the path of each OBJ.
+    """
+
+    def __init__(self, root, layout="hf-blobs", cache_path=None, obj_template=None, threads=16):
+        if layout == "template" and not obj_template:
+            raise ValueError("layout 'template' needs an obj_template")
+        if layout != "template" and layout not in LAYOUTS:
+            raise ValueError(f"unknown layout '{layout}' (choose from {', '.join(LAYOUTS)}, template)")
+        self.root = root
+        self.layout = layout
+        self.cache_path = cache_path
+        self.obj_template = obj_template
+        self.threads = threads
+        self.paths = {}
+        self.missing = []
+        self.seconds = 0.0
+
+    def _signature(self):
+        return {"root": self.root, "layout": self.layout, "obj_template": self.obj_template}
+
+    def _load_cache(self):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path) as f:
+                data = json.load(f)
+        except ValueError:
+            return {}
+        return data.get("paths", {}) if data.get("signature") == self._signature() else {}
+
+    def _save_cache(self):
+        if not self.cache_path:
+            return
+        # Several workers may resolve at once: merge with what is there, replace atomically
+        paths = dict(self._load_cache(), **self.paths)
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"signature": self._signature(), "paths": paths}, f)
+        os.replace(tmp_path, self.cache_path)
+
+    def _bases(self):
+        pattern = LAYOUTS[self.layout].format(root=self.root)
+        bases = [b for b in glob.glob(pattern) if os.path.isdir(b)]
+        return sorted(bases, key=os.path.getmtime, reverse=True)
+
+    def _check_model_dir(self, model_dir):
+        models_dir = os.path.dirname(os.path.join(model_dir, MODEL_FILE))
+        try:
+            names = set(os.listdir(models_dir))
+        except OSError:
+            return None
+        obj_name = os.path.basename(MODEL_FILE)
+        if obj_name not in names:
+            return None
+        mtl_name = obj_name[:-4] + ".mtl"
+        return [os.path.join(models_dir, obj_name), os.path.join(models_dir, mtl_name) if mtl_name in names else None]
+
+    def _check_template(self, relative_path):
+        obj_path = self.obj_template.format(root=self.root, relative_path=relative_path)
+        if not os.path.isfile(obj_path):
+            return None
+        mtl_path = obj_path[:-4] + ".mtl"
+        return [obj_path, mtl_path if os.path.isfile(mtl_path) else None]
+
+    def resolve(self, relative_paths, rescan=False):
+        """Fills self.paths / self.missing for relative_paths; returns the missing ones."""
+        start = time.time()
+        cached = {} if rescan else self._load_cache()
+        todo = [rel for rel in relative_paths if rel not in cached]
+        self.paths = {rel: cached[rel] for rel in relative_paths if rel in cached}
+
+        if self.layout == "template":
+            check = self._check_template
+        else:
+            # One listdir per category and base instead of a stat per model
+            bases = self._bases()
+            listings = {}
+            for base in bases:
+                for category in {rel.split('/', 1)[0] for rel in todo}:
+                    try:
+                        listings[(base, category)] = set(os.listdir(os.path.join(base, category)))
+                    except OSError:
+                        listings[(base, category)] = set()
+
+            def check(rel):
+                category, model_id = rel.split('/', 1)
+                for base in bases:
+                    if model_id in listings[(base, category)]:
+                        found = self._check_model_dir(os.path.join(base, rel))
+                        if found:
+                            return found
+                return None
+
+        with ThreadPoolExecutor(max_workers=self.threads) as pool:
+            results = list(pool.map(check, todo))
+
+        self.missing = []
+        for rel, found in zip(todo, results):
+            if found:
+                self.paths[rel] = found
+            else:
+                self.missing.append(rel)
+
+        if todo:
+            self._save_cache()
+        self.seconds = time.time() - start
+        return self.missing
+
+    def obj_path(self, relative_path):
+        entry = self.paths.get(relative_path)
+        return entry[0] if entry else None
+
+    def mtl_path(self, relative_path):
+        entry = self.paths.get(relative_path)
+        return entry[1] if entry else None
+
+    def summary(self):
+        return (f"{len(self.paths)} found, {len(self.missing)} missing "
+                f"({self.layout}, {self.seconds:.1f}s)")
+
+# -----------------------------------------------------------------------------
+# COMMAND LINE
+# -----------------------------------------------------------------------------
+
+def add_dataset_arguments(parser, default_root):
+    parser.add_argument("--dataset-root", default=default_root,
+                        help="Dataset root (default: FILEPATH_NAME)")
+    parser.add_argument("--layout", choices=sorted(LAYOUTS) + ["template"], default=None,
+                        help="Dataset layout (default: hf-blobs, or 'template' when --obj-template is given)")
+    parser.add_argument("--obj-template", default=None,
+                        help="OBJ path pattern with {root} and {relative_path} (layout 'template')")
+    parser.add_argument("--dataset-cache", default=".dataset_paths.json",
+                        help="Cache of resolved OBJ/MTL paths ('' = no cache)")
+    parser.add_argument("--rescan-dataset", action="store_true",
+                        help="Ignore the path cache and scan the dataset again")
+
+def resolver_from_options(options):
+    layout = options.layout or ("template" if options.obj_template else "hf-blobs")
+    return DatasetResolver(options.dataset_root, layout, options.dataset_cache or None, options.obj_template)
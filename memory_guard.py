@@ -0,0 +1,73 @@
+import bpy
+import os
+import sys
+
+from stage_timer import current_rss_mb
+
+# -----------------------------------------------------------------------------
+# CONFIGURATION
+# -----------------------------------------------------------------------------
+# Number of times this worker already restarted itself (survives os.execv)
+RESTART_ENV = "RENDER_WORKER_RESTARTS"
+
+# -----------------------------------------------------------------------------
+# HELPER FUNCTIONS
+# -----------------------------------------------------------------------------
+
+def restart_count():
+    return int(os.environ.get(RESTART_ENV, "0"))
+
+def writer_suffix():
+    """Appended to journal/shard writer names so a restarted process never reuses its files."""
+    count = restart_count()
+    return f"-r{count}" if count else ""
+
+def purge_orphans():
+    """Removes every datablock type with zero users (recursively); returns how many."""
+    try:
+        return bpy.data.orphans_purge(do_local_ids=True, do_linked_ids=True, do_recursive=True)
+    except (AttributeError, TypeError):
+        # Blender < 3.2: repeat the single-level purge until nothing is left
+        removed = 0
+        while True:
+            count = bpy.data.orphans_purge() if hasattr(bpy.data, "orphans_purge") else 0
+            if not count:
+                return removed
+            removed += count
+
+# -----------------------------------------------------------------------------
+# MEMORY GUARD
+# -----------------------------------------------------------------------------
+
+class MemoryGuard:
+    """
+    Per-model memory bookkeeping for long runs: purge orphans at the model
+    boundary, sample RSS, and once RSS crosses max_rss_mb, replace this
+    Blender process with a fresh one (os.execv, same PID and arguments).
+    The caller checkpoints first (flush/close journal and outputs); the new
+    process skips everything already journaled and carries on.
+    """
+
+    def __init__(self, max_rss_mb=None):
+        self.max_rss_mb = max_rss_mb
+        self.models = 0
+        self.start_rss_mb = current_rss_mb()
+        self.last_rss_mb = self.start_rss_mb
+
+    def end_model(self, timer=None):
+        """Purges orphans and samples RSS; returns True when the ceiling is crossed."""
+        removed = purge_orphans()
+        self.models += 1
+        self.last_rss_mb = current_rss_mb()
+        if timer is not None:
+            timer.note(orphans_purged=removed, rss_mb=round(self.last_rss_mb, 1))
+        return bool(self.max_rss_mb) and self.last_rss_mb > self.max_rss_mb
+
+    def restart(self):
+        print(f"♻️  RSS {self.last_rss_mb:.0f} MB > {self.max_rss_mb} MB after {self.models} models, "
+              f"restarting Blender (restart #{restart_count() + 1})", flush=True)
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.environ[RESTART_ENV] = str(restart_count() + 1)
+        # Blender's sys.argv is the full command line: blender -b ... -P script -- args
+        os.execv(bpy.app.binary_path, [bpy.app.binary_path] + sys.argv[1:])
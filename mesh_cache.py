@@ -0,0 +1,412 @@
+import bpy
+import hashlib
+import json
+import numpy as np
+import os
+import tempfile
+from mathutils import Matrix
+
+# -----------------------------------------------------------------------------
+# CONFIGURATION
+# -----------------------------------------------------------------------------
+# Bump when the array layout below changes; older files are treated as misses.
+CACHE_VERSION = 1
+
+# -----------------------------------------------------------------------------
+# CACHE STORE
+# -----------------------------------------------------------------------------
+
+class MeshCache:
+    """
+    Folder of uncompressed .npz files, one per model, keyed by a relative path
+    such as '02747177/10839d0dc35c94fcf4fb4dee5181bee' (the directory.txt entry).
+
+    With max_bytes set, stores evict least-recently-used entries (file mtime,
+    bumped on every hit) until the folder fits the budget again.
+    """
+
+    def __init__(self, root, max_bytes=None):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._estimated_bytes = None
+
+    def path_for(self, key):
+        return os.path.join(self.root, *key.split('/')) + ".npz"
+
+    def load(self, key):
+        """Returns the stored arrays as a dict, or None if missing/stale."""
+        path = self.path_for(key)
+        if not os.path.exists(path):
+            self.misses += 1
+            return None
+
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                arrays = {name: data[name] for name in data.files}
+        except Exception as e:
+            print(f"❌ Mesh cache read failed ({path}): {e}")
+            self.misses += 1
+            return None
+
+        if int(arrays.get("version", -1)) != CACHE_VERSION:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        if self.max_bytes:
+            # LRU clock for eviction
+            os.utime(path)
+        return arrays
+
+    def store(self, key, arrays):
+        """Writes atomically (temp file + rename) so a crash never leaves a torn entry."""
+        path = self.path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, **arrays)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        if self.max_bytes:
+            if self._estimated_bytes is None:
+                self._estimated_bytes = sum(size for _, size, _ in self._scan())
+            else:
+                self._estimated_bytes += os.path.getsize(path)
+            if self._estimated_bytes > self.max_bytes:
+                self._evict()
+
+    def _scan(self):
+        """(path, size, mtime) for every entry; other processes may share the folder."""
+        entries = []
+        for folder, _, files in os.walk(self.root):
+            for name in files:
+                if name.endswith(".npz"):
+                    path = os.path.join(folder, name)
+                    try:
+                        st = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    entries.append((path, st.st_size, st.st_mtime))
+        return entries
+
+    def _evict(self):
+        # Rescan: the running estimate does not see other workers' writes
+        entries = sorted(self._scan(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            self.evictions += 1
+        self._estimated_bytes = total
+
+def settings_digest(settings):
+    """Short stable hash of a settings dict, for cache keys."""
+    blob = json.dumps(settings, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha1(blob).hexdigest()[:12]
+
+def shapegen_cache_key(amount, seed, settings):
+    """Cache key of a baked Shape Generator result: bake settings, then amount/seed."""
+    return f"shapegen/{settings_digest(settings)}/{amount}/{seed}"
+
+# -----------------------------------------------------------------------------
+# SHAPE GENERATOR BAKES (shared by ShapeGen.py and ShapeGen_batch.py)
+# -----------------------------------------------------------------------------
+SHAPEGEN_BAKE_SETTINGS = {
+    "mirror_x": False, "mirror_y": False, "mirror_z": False,
+    "is_bevel": True, "bevel_segments": 10,
+    "is_subsurf": True, "subsurf_segments": 2,
+    "join_objects": True, "bake_smooth_result": True, "bake_object": True,
+    "shade_smooth": True, "origin": "BOUNDS",
+}
+
+# "legacy": one rebuild per property (the default); "batched": configure everything, then
+# regenerate + bake once. Batched applies Bevel/Mirror/Subdivision after the single rebuild
+# instead of before the join, so its bakes are keyed (and may come out) differently
+SHAPEGEN_BAKE_CONFIGS = ("batched", "legacy")
+
+def shape_generator_version():
+    """Installed Shape Generator add-on version (part of the cache key: remesh defaults live there)."""
+    try:
+        import addon_utils
+        for module in addon_utils.modules():
+            info = addon_utils.module_bl_info(module)
+            if info.get("name") == "Shape Generator":
+                return ".".join(str(v) for v in info.get("version", ()))
+    except Exception:
+        pass
+    return "unknown"
+
+def shapegen_key_settings(bake_config="legacy"):
+    """Everything that determines a bake; legacy bakes keep the keys they had before bake_config existed."""
+    settings = dict(SHAPEGEN_BAKE_SETTINGS, addon=shape_generator_version())
+    if bake_config != "legacy":
+        settings["bake_config"] = bake_config
+    return settings
+
+# -----------------------------------------------------------------------------
+# NORMALS (API changed in Blender 4.1)
+# -----------------------------------------------------------------------------
+
+def _get_corner_normals(mesh):
+    count = len(mesh.loops)
+    normals = np.empty(count * 3, dtype=np.float32)
+    if hasattr(mesh, "corner_normals"):
+        mesh.corner_normals.foreach_get("vector", normals)
+    else:
+        mesh.calc_normals_split()
+        mesh.loops.foreach_get("normal", normals)
+    return normals.reshape(-1, 3)
+
+def _set_corner_normals(mesh, normals):
+    if hasattr(mesh, "use_auto_smooth"):
+        mesh.use_auto_smooth = True
+    mesh.normals_split_custom_set(normals.tolist())
+
+# -----------------------------------------------------------------------------
+# CAPTURE (Blender objects -> arrays)
+# -----------------------------------------------------------------------------
+
+def capture_objects(objects, all_normals=False):
+    """
+    Flattens mesh objects into plain arrays: vertices, face corners, polygon
+    starts/materials/smooth flags, custom normals, per-object matrices and the
+    Workbench-visible material settings (viewport display color etc.).
+    With all_normals, meshes without custom normals also store their computed
+    corner normals (needed to merge them without changing the shading).
+    """
+    objects = [o for o in objects if o.type == 'MESH']
+
+    material_index = {}
+    material_list = []
+
+    vertices, loops, poly_starts, poly_materials, poly_smooth, normals = [], [], [], [], [], []
+    counts, matrices, names, has_normals = [], [], [], []
+    slot_counts, slot_materials = [], []
+
+    for obj in objects:
+        mesh = obj.data
+        n_verts, n_loops, n_polys = len(mesh.vertices), len(mesh.loops), len(mesh.polygons)
+
+        co = np.empty(n_verts * 3, dtype=np.float32)
+        mesh.vertices.foreach_get("co", co)
+        vertex_index = np.empty(n_loops, dtype=np.int32)
+        mesh.loops.foreach_get("vertex_index", vertex_index)
+        loop_start = np.empty(n_polys, dtype=np.int32)
+        mesh.polygons.foreach_get("loop_start", loop_start)
+        mat_idx = np.empty(n_polys, dtype=np.int32)
+        mesh.polygons.foreach_get("material_index", mat_idx)
+        smooth = np.empty(n_polys, dtype=bool)
+        mesh.polygons.foreach_get("use_smooth", smooth)
+
+        custom = all_normals or bool(getattr(mesh, "has_custom_normals", False))
+        if custom:
+            normals.append(_get_corner_normals(mesh))
+
+        vertices.append(co.reshape(-1, 3))
+        loops.append(vertex_index)
+        poly_starts.append(loop_start)
+        poly_materials.append(mat_idx)
+        poly_smooth.append(smooth)
+        counts.append((n_verts, n_loops, n_polys))
+        matrices.append(np.array(obj.matrix_world, dtype=np.float32))
+        names.append(obj.name)
+        has_normals.append(custom)
+
+        slot_counts.append(len(mesh.materials))
+        for mat in mesh.materials:
+            if mat is None:
+                slot_materials.append(-1)
+                continue
+            if mat.name not in material_index:
+                material_index[mat.name] = len(material_list)
+                material_list.append(mat)
+            slot_materials.append(material_index[mat.name])
+
+    def _cat(parts, dtype, shape=(0,)):
+        return np.concatenate(parts).astype(dtype, copy=False) if parts else np.zeros(shape, dtype=dtype)
+
+    return {
+        "version": np.array(CACHE_VERSION),
+        "vertices": _cat(vertices, np.float32, (0, 3)),
+        "loops": _cat(loops, np.int32),
+        "poly_starts": _cat(poly_starts, np.int32),
+        "poly_materials": _cat(poly_materials, np.int32),
+        "poly_smooth": _cat(poly_smooth, bool),
+        "normals": _cat(normals, np.float32, (0, 3)),
+        "object_counts": np.array(counts, dtype=np.int64).reshape(-1, 3),
+        "object_matrices": np.array(matrices, dtype=np.float32).reshape(-1, 4, 4),
+        "object_names": np.array(names, dtype=str),
+        "object_has_normals": np.array(has_normals, dtype=bool),
+        "slot_counts": np.array(slot_counts, dtype=np.int32),
+        "slot_materials": np.array(slot_materials, dtype=np.int32),
+        "material_names": np.array([m.name for m in material_list], dtype=str),
+        "material_colors": np.array([tuple(m.diffuse_color) for m in material_list], dtype=np.float32).reshape(-1, 4),
+        "material_metallic": np.array([m.metallic for m in material_list], dtype=np.float32),
+        "material_roughness": np.array([m.roughness for m in material_list], dtype=np.float32),
+        "material_backface": np.array([m.use_backface_culling for m in material_list], dtype=bool),
+    }
+
+# -----------------------------------------------------------------------------
+# MERGE (many captured objects -> one)
+# -----------------------------------------------------------------------------
+
+def merge_arrays(arrays, name="merged"):
+    """
+    Joins every captured object into one, in world space: vertices are
+    transformed by their object matrix, corner indices and polygon starts are
+    offset, and each polygon's material index is remapped to one slot per
+    distinct material (plus one empty slot for parts without materials).
+    Expects normals for every object (capture_objects(..., all_normals=True)).
+    """
+    counts = arrays["object_counts"]
+    if not arrays["object_has_normals"].all():
+        raise ValueError("merge_arrays needs corner normals for every object")
+
+    vertices, loops, poly_starts, poly_materials, normals = [], [], [], [], []
+    slot_of_material = {}
+    v_off = l_off = p_off = s_off = 0
+    for i, (n_verts, n_loops, n_polys) in enumerate(counts):
+        matrix = arrays["object_matrices"][i].astype(np.float64)
+        co = arrays["vertices"][v_off:v_off + n_verts].astype(np.float64)
+        vertices.append(co @ matrix[:3, :3].T + matrix[:3, 3])
+
+        normal_matrix = np.linalg.inv(matrix[:3, :3]).T
+        nor = arrays["normals"][l_off:l_off + n_loops].astype(np.float64) @ normal_matrix.T
+        lengths = np.linalg.norm(nor, axis=1, keepdims=True)
+        normals.append(np.divide(nor, lengths, out=np.zeros_like(nor), where=lengths > 0))
+
+        loops.append(arrays["loops"][l_off:l_off + n_loops] + v_off)
+        poly_starts.append(arrays["poly_starts"][p_off:p_off + n_polys] + l_off)
+
+        # Local slot -> global slot (the material itself, -1 = empty slot)
+        slots = arrays["slot_materials"][s_off:s_off + arrays["slot_counts"][i]]
+        if len(slots) == 0:
+            slots = np.array([-1], dtype=np.int32)
+        remap = np.array([slot_of_material.setdefault(int(m), len(slot_of_material)) for m in slots], dtype=np.int32)
+        local = np.clip(arrays["poly_materials"][p_off:p_off + n_polys], 0, len(slots) - 1)
+        poly_materials.append(remap[local])
+
+        v_off += n_verts; l_off += n_loops; p_off += n_polys
+        s_off += arrays["slot_counts"][i]
+
+    merged = dict(arrays)
+    merged.update({
+        "vertices": np.concatenate(vertices).astype(np.float32),
+        "loops": np.concatenate(loops).astype(np.int32),
+        "poly_starts": np.concatenate(poly_starts).astype(np.int32),
+        "poly_materials": np.concatenate(poly_materials).astype(np.int32),
+        "normals": np.concatenate(normals).astype(np.float32),
+        "object_counts": np.array([[v_off, l_off, p_off]], dtype=np.int64),
+        "object_matrices": np.eye(4, dtype=np.float32)[None],
+        "object_names": np.array([name], dtype=str),
+        "object_has_normals": np.array([True]),
+        "slot_counts": np.array([len(slot_of_material)], dtype=np.int32),
+        "slot_materials": np.array(list(slot_of_material), dtype=np.int32),
+    })
+    return merged
+
+def merge_objects(objects, collection, name="merged"):
+    """Replaces the mesh objects by ONE object (bulk arrays, no bpy.ops.object.join); returns [it]."""
+    objects = [o for o in objects if o.type == 'MESH']
+    if len(objects) < 2:
+        return objects
+    merged = merge_arrays(capture_objects(objects, all_normals=True), name)
+    meshes = [o.data for o in objects]
+    bpy.data.batch_remove(objects)
+    bpy.data.batch_remove([m for m in meshes if m.users == 0])
+    return build_objects(merged, collection)
+
+# -----------------------------------------------------------------------------
+# BUILD (arrays -> Blender objects)
+# -----------------------------------------------------------------------------
+
+def build_mesh(name, vertices, loops, poly_starts, poly_materials=None, poly_smooth=None, normals=None):
+    """Creates a mesh datablock in bulk with foreach_set (no operators)."""
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(len(vertices))
+    mesh.loops.add(len(loops))
+    mesh.polygons.add(len(poly_starts))
+
+    mesh.vertices.foreach_set("co", np.ascontiguousarray(vertices, dtype=np.float32).ravel())
+    mesh.loops.foreach_set("vertex_index", np.ascontiguousarray(loops, dtype=np.int32))
+    mesh.polygons.foreach_set("loop_start", np.ascontiguousarray(poly_starts, dtype=np.int32))
+
+    # Blender < 4.0 also needs explicit loop_total (read-only afterwards)
+    try:
+        totals = np.diff(np.append(poly_starts, len(loops))).astype(np.int32)
+        mesh.polygons.foreach_set("loop_total", totals)
+    except (AttributeError, TypeError, RuntimeError):
+        pass
+
+    if poly_materials is not None and len(poly_materials):
+        mesh.polygons.foreach_set("material_index", np.ascontiguousarray(poly_materials, dtype=np.int32))
+    if poly_smooth is not None and len(poly_smooth):
+        mesh.polygons.foreach_set("use_smooth", np.ascontiguousarray(poly_smooth, dtype=bool))
+
+    mesh.update(calc_edges=True)
+
+    if normals is not None and len(normals):
+        _set_corner_normals(mesh, normals)
+
+    return mesh
+
+def build_materials(arrays):
+    materials = []
+    for i, name in enumerate(arrays["material_names"]):
+        mat = bpy.data.materials.new(name=str(name))
+        mat.use_nodes = False
+        mat.diffuse_color = tuple(arrays["material_colors"][i])
+        mat.metallic = float(arrays["material_metallic"][i])
+        mat.roughness = float(arrays["material_roughness"][i])
+        mat.use_backface_culling = bool(arrays["material_backface"][i])
+        materials.append(mat)
+    return materials
+
+def build_objects(arrays, collection):
+    """Recreates the captured objects inside `collection` and returns them."""
+    materials = build_materials(arrays)
+
+    objects = []
+    v_off = l_off = p_off = n_off = s_off = 0
+    for i, (n_verts, n_loops, n_polys) in enumerate(arrays["object_counts"]):
+        name = str(arrays["object_names"][i])
+        normals = None
+        if arrays["object_has_normals"][i]:
+            normals = arrays["normals"][n_off:n_off + n_loops]
+            n_off += n_loops
+
+        mesh = build_mesh(
+            name,
+            arrays["vertices"][v_off:v_off + n_verts],
+            arrays["loops"][l_off:l_off + n_loops],
+            arrays["poly_starts"][p_off:p_off + n_polys],
+            arrays["poly_materials"][p_off:p_off + n_polys],
+            arrays["poly_smooth"][p_off:p_off + n_polys],
+            normals,
+        )
+        v_off += n_verts; l_off += n_loops; p_off += n_polys
+
+        for slot in arrays["slot_materials"][s_off:s_off + arrays["slot_counts"][i]]:
+            mesh.materials.append(materials[slot] if slot >= 0 else None)
+        s_off += arrays["slot_counts"][i]
+
+        obj = bpy.data.objects.new(name, mesh)
+        collection.objects.link(obj)
+        obj.matrix_world = Matrix(arrays["object_matrices"][i].tolist())
+        objects.append(obj)
+
+    return objects
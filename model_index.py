@@ -0,0 +1,154 @@
+import argparse
+import json
+import os
+import sys
+import time
+from array import array
+from multiprocessing import Pool
+
+import numpy as np
+
+from dataset_resolver import add_dataset_arguments, resolver_from_options
+
+# -----------------------------------------------------------------------------
+# CONFIGURATION
+# -----------------------------------------------------------------------------
+# Same defaults as ShapeNet_batch.py
+INPUT_FILE_NAME = "directory.txt"
+FILEPATH_NAME = '/Users/albert'
+
+INDEX_FILE_NAME = "model_index.jsonl"
+
+# -----------------------------------------------------------------------------
+# STREAMING OBJ SCAN
+# -----------------------------------------------------------------------------
+
+def scan_obj(path):
+    """
+    One pass over the OBJ text (no Blender). Mirrors what ShapeNet_batch imports:
+    'o'/'g' lines start a new object (use_split_objects/groups), every object
+    gets the vertices its faces reference, and OBJ (x, y, z) becomes Blender
+    (x, -z, y). The centroid is the mean of those imported vertices, the
+    bounding radius is measured from the centroid.
+    """
+    coords = array('d')
+    objects = []
+    current = set()
+    faces = 0
+
+    with open(path, 'rb') as f:
+        for line in f:
+            if line.startswith(b'v '):
+                parts = line.split()
+                coords.extend((float(parts[1]), float(parts[2]), float(parts[3])))
+            elif line.startswith(b'f '):
+                faces += 1
+                vertex_count = len(coords) // 3
+                for token in line.split()[1:]:
+                    index = int(token.split(b'/', 1)[0])
+                    current.add(index - 1 if index > 0 else vertex_count + index)
+            elif line.startswith((b'o ', b'g ')):
+                if current:
+                    objects.append(current)
+                current = set()
+    if current:
+        objects.append(current)
+
+    entry = {"file_size": os.path.getsize(path), "obj_vertices": len(coords) // 3,
+             "faces": faces, "objects": len(objects)}
+    if not objects:
+        entry.update(vertices=0, centroid=None, bbox_min=None, bbox_max=None, radius=None)
+        return entry
+
+    vertices = np.frombuffer(coords, dtype=np.float64).reshape(-1, 3)
+    used = np.concatenate([np.fromiter(o, dtype=np.int64, count=len(o)) for o in objects])
+    points = vertices[used][:, [0, 2, 1]] * np.array([1.0, -1.0, 1.0])
+
+    centroid = points.mean(axis=0)
+    entry.update(
+        vertices=len(points),
+        centroid=[round(float(v), 7) for v in centroid],
+        bbox_min=[round(float(v), 7) for v in points.min(axis=0)],
+        bbox_max=[round(float(v), 7) for v in points.max(axis=0)],
+        radius=round(float(np.sqrt(((points - centroid) ** 2).sum(axis=1).max())), 7),
+    )
+    return entry
+
+
+def scan_entry(job):
+    relative_path, obj_path = job
+    try:
+        entry = scan_obj(obj_path)
+    except FileNotFoundError:
+        entry = {"error": "missing"}
+    except Exception as e:
+        entry = {"error": f"{type(e).__name__}: {e}"}
+    entry["key"] = relative_path
+    return entry
+
+# -----------------------------------------------------------------------------
+# INDEX FILE
+# -----------------------------------------------------------------------------
+
+def load_model_index(path):
+    """{relative_path: entry} from the JSONL index (later lines win, torn lines are skipped)."""
+    index = {}
+    if not path or not os.path.exists(path):
+        return index
+    with open(path) as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            index[entry["key"]] = entry
+    return index
+
+
+def job_cost(entry):
+    """Scheduling weight of a model: faces, else file size (unknown models sort last)."""
+    if not entry or "error" in entry:
+        return 0
+    return entry.get("faces") or entry.get("file_size", 0)
+
+# -----------------------------------------------------------------------------
+# MAIN ENTRY POINT
+# -----------------------------------------------------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Pre-scan every OBJ in directory.txt into a JSONL metadata index (no Blender).",
+        epilog="Example: python3 model_index.py --workers 32"
+    )
+    parser.add_argument("--input-list", default=INPUT_FILE_NAME, help="Model list, one category/model_id per line")
+    add_dataset_arguments(parser, FILEPATH_NAME)
+    parser.add_argument("--index", default=INDEX_FILE_NAME, help="Index file (appended; existing entries are kept)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Scan processes")
+    parser.add_argument("--rescan", action="store_true", help="Scan entries already in the index again")
+    options = parser.parse_args()
+
+    with open(options.input_list) as f:
+        lines = [line.strip() for line in f if line.strip()]
+
+    existing = {} if options.rescan else load_model_index(options.index)
+    todo = [rel for rel in lines if rel not in existing or "error" in existing[rel]]
+
+    resolver = resolver_from_options(options)
+    resolver.resolve(todo, options.rescan_dataset)
+    print(f"🗺️  Dataset: {resolver.summary()}")
+    jobs = [(rel, resolver.obj_path(rel) or "") for rel in todo]
+    print(f"📂 {len(lines)} models, {len(lines) - len(jobs)} already indexed, scanning {len(jobs)}")
+
+    start = time.time()
+    errors = 0
+    with open(options.index, "a") as out, Pool(options.workers) as pool:
+        for done, entry in enumerate(pool.imap_unordered(scan_entry, jobs, chunksize=8), 1):
+            out.write(json.dumps(entry) + "\n")
+            if "error" in entry:
+                errors += 1
+                print(f"❌ {entry['key']}: {entry['error']}")
+            if done % 500 == 0 or done == len(jobs):
+                out.flush()
+                print(f"[{done}/{len(jobs)}] {done / max(time.time() - start, 1e-6):.0f} models/s")
+
+    print(f"🎉 Index: {options.index} ({errors} errors)")
+    sys.exit(1 if errors else 0)
@@ -0,0 +1,292 @@
+import argparse
+import numpy as np
+import os
+import re
+from itertools import repeat
+
+# -----------------------------------------------------------------------------
+# CONFIGURATION
+# -----------------------------------------------------------------------------
+# Patterns start at the newline (the buffer gets one prepended): a literal prefix lets
+# the regex engine skip ahead instead of trying every byte as a '^' position
+STATE_PATTERN = re.compile(rb"\n(o|g|usemtl|s)(?=[ \t\r\n])[ \t]*([^\r\n]*)")
+VERTEX_PATTERN = re.compile(rb"\nv[ \t]+([^\r\n]*)")
+NORMAL_PATTERN = re.compile(rb"\nvn[ \t]+([^\r\n]*)")
+FACE_PATTERN = re.compile(rb"\nf[ \t]+([^\r\n]*)")
+VERTEX_LINE_PATTERN = re.compile(rb"\nv[ \t]")
+NORMAL_LINE_PATTERN = re.compile(rb"\nvn[ \t]")
+TOKEN_PATTERN = re.compile(rb"(-?\d+)(?:/(-?\d*)(?:/(-?\d+))?)?")
+
+# Blender's OBJ importer defaults: forward -Z, up Y -> (x, y, z) becomes (x, -z, y)
+AXIS_ORDER = [0, 2, 1]
+AXIS_SIGN = np.array([1.0, -1.0, 1.0])
+
+# bpy.data.materials.new() defaults for what MTL files do not set
+DEFAULT_COLOR = (0.8, 0.8, 0.8, 1.0)
+DEFAULT_ROUGHNESS = 0.4
+
+# -----------------------------------------------------------------------------
+# MTL
+# -----------------------------------------------------------------------------
+
+def parse_mtl(data):
+    """{material name: RGBA} from the newmtl / Kd (and d) lines."""
+    colors = {}
+    name = None
+    for line in data.splitlines():
+        parts = line.split()
+        if not parts:
+            continue
+        if parts[0] == b"newmtl":
+            name = b" ".join(parts[1:]).decode("utf-8", "replace")
+            colors[name] = list(DEFAULT_COLOR)
+        elif name is not None and parts[0] == b"Kd" and len(parts) >= 4:
+            colors[name][:3] = [float(v) for v in parts[1:4]]
+        elif name is not None and parts[0] == b"d" and len(parts) >= 2:
+            colors[name][3] = float(parts[1])
+    return colors
+
+def mtl_paths(data, obj_path):
+    folder = os.path.dirname(obj_path)
+    return [os.path.join(folder, m.group(1).decode("utf-8", "replace").strip())
+            for m in re.finditer(rb"^mtllib[ \t]+([^\r\n]+)", data, re.M)]
+
+# -----------------------------------------------------------------------------
+# OBJ
+# -----------------------------------------------------------------------------
+
+def _float_rows(pattern, data):
+    rows = pattern.findall(data)
+    if not rows:
+        return np.zeros((0, 3))
+    values = np.fromstring(b"\n".join(rows), sep=" ")
+    if values.size != 3 * len(rows):
+        # Extra columns (w, vertex colors) or malformed lines: take the first three per line
+        values = np.array([(row.split() + [b"0"] * 3)[:3] for row in rows]).astype(np.float64)
+    return values.reshape(-1, 3)[:, AXIS_ORDER] * AXIS_SIGN
+
+def _resolve(indices, counts_before):
+    """OBJ indices (1-based, negative = relative) -> 0-based."""
+    return np.where(indices > 0, indices - 1, counts_before + indices)
+
+def _parse_faces(chunk, chunk_start, line_index):
+    """Vertex/normal indices and corner counts of every 'f' line in chunk (vectorized per chunk)."""
+    bodies = FACE_PATTERN.findall(chunk)
+    if not bodies:
+        return None
+    counts = np.fromiter(map(len, map(bytes.split, bodies)), dtype=np.int64, count=len(bodies))
+    joined = b"\n".join(bodies)
+
+    # Fast path: every token has the same form (v, v/vt, v//vn or v/vt/vn), checked per token
+    tokens = joined.split()
+    slashes = np.fromiter(map(bytes.count, tokens, repeat(b"/")), dtype=np.int64, count=len(tokens))
+    fields = int(slashes[0]) + 1 if len(slashes) else 1
+    values = None
+    if len(slashes) and (slashes == slashes[0]).all():
+        values = np.fromstring(joined.replace(b"//", b"/0/").replace(b"/", b" "), dtype=np.int64, sep=" ")
+    if values is not None and values.size == len(tokens) * fields:
+        table = values.reshape(-1, fields)
+        v_idx = table[:, 0]
+        n_idx = table[:, 2] if fields == 3 else np.zeros(len(table), dtype=np.int64)
+    else:
+        table = np.array(TOKEN_PATTERN.findall(joined))
+        v_idx = table[:, 0].astype(np.int64)
+        n_idx = np.where(table[:, 2] == b"", b"0", table[:, 2]).astype(np.int64)
+
+    if (v_idx < 0).any() or (n_idx < 0).any():
+        # Relative indices: count the v / vn lines before every face line
+        vertex_lines, normal_lines = line_index()
+        face_pos = np.repeat([chunk_start + m.start() for m in FACE_PATTERN.finditer(chunk)], counts)
+        v_idx = _resolve(v_idx, np.searchsorted(vertex_lines, face_pos))
+        n_idx = np.where(n_idx == 0, -1, _resolve(n_idx, np.searchsorted(normal_lines, face_pos)))
+    else:
+        v_idx = v_idx - 1
+        n_idx = n_idx - 1
+    return v_idx, n_idx, counts
+
+def parse_obj(data, materials=None, name="model_normalized"):
+    """
+    OBJ bytes -> arrays in the mesh_cache capture layout, minus the cache
+    version (build_objects() turns them into Blender objects). Keeps positions,
+    faces, 'o'/'g' objects (as use_split_objects/use_split_groups), usemtl
+    slots, 's' smoothing and, when present, vn corner normals; UVs and
+    everything else are skipped.
+    `materials` is the parse_mtl() result.
+    """
+    materials = materials or {}
+    data = b"\n" + data + b"\n"
+    vertices = _float_rows(VERTEX_PATTERN, data)
+    normals = _float_rows(NORMAL_PATTERN, data)
+    line_cache = []
+
+    def line_index():
+        # Offsets of every v / vn line, only built for files that use relative indices
+        if not line_cache:
+            line_cache.extend(np.array([m.start() for m in pattern.finditer(data)], dtype=np.int64)
+                              for pattern in (VERTEX_LINE_PATTERN, NORMAL_LINE_PATTERN))
+        return line_cache
+
+    # Split the file at every state change; faces between two changes share object/material/smoothing
+    objects = []          # [name, {material: slot}, [(v_idx, n_idx, counts, slot, smooth)]]
+    current = [name, {}, []]
+    material, smooth = None, False
+    position = 0
+
+    def flush(end):
+        if end > position:
+            faces = _parse_faces(data[position:end], position, line_index)
+            if faces is not None:
+                slot = current[1].setdefault(material, len(current[1]))
+                current[2].append((*faces, slot, smooth))
+
+    for match in STATE_PATTERN.finditer(data):
+        flush(match.start())
+        position = match.end()
+        keyword, value = match.group(1), match.group(2).strip().decode("utf-8", "replace")
+        if keyword in (b"o", b"g"):
+            if current[2]:
+                objects.append(current)
+            current = [value or name, {}, []]
+        elif keyword == b"usemtl":
+            material = value
+        else:
+            smooth = value not in ("", "off", "0")
+    flush(len(data))
+    if current[2]:
+        objects.append(current)
+
+    return _to_arrays(objects, vertices, normals, materials)
+
+def _to_arrays(objects, vertices, normals, materials):
+    material_names = []
+    material_index = {}
+
+    all_vertices, all_loops, all_starts, all_materials, all_smooth, all_normals = [], [], [], [], [], []
+    counts, names, has_normals, slot_counts, slot_materials = [], [], [], [], []
+
+    for obj_name, slots, chunks in objects:
+        v_idx = np.concatenate([c[0] for c in chunks])
+        n_idx = np.concatenate([c[1] for c in chunks])
+        corner_counts = np.concatenate([c[2] for c in chunks])
+        poly_slot = np.concatenate([np.full(len(c[2]), c[3], dtype=np.int32) for c in chunks])
+        poly_smooth = np.concatenate([np.full(len(c[2]), c[4], dtype=bool) for c in chunks])
+
+        # Repeated consecutive corners ('f 1 2 2') would make invalid polygons
+        starts = np.cumsum(corner_counts) - corner_counts
+        following = np.arange(1, len(v_idx) + 1)
+        following[starts + corner_counts - 1] = starts
+        repeated = v_idx == v_idx[following]
+        if repeated.any():
+            v_idx, n_idx = v_idx[~repeated], n_idx[~repeated]
+            corner_counts = corner_counts - np.add.reduceat(repeated, starts)
+
+        # Points and lines are not faces (the importer drops them too)
+        keep = corner_counts >= 3
+        if not keep.all():
+            corner_keep = np.repeat(keep, corner_counts)
+            v_idx, n_idx = v_idx[corner_keep], n_idx[corner_keep]
+            corner_counts, poly_slot, poly_smooth = corner_counts[keep], poly_slot[keep], poly_smooth[keep]
+        if not len(corner_counts):
+            continue
+
+        # Each object only gets the vertices its faces use
+        used, loops = np.unique(v_idx, return_inverse=True)
+        all_vertices.append(vertices[used])
+        all_loops.append(loops.astype(np.int32))
+        all_starts.append((np.cumsum(corner_counts) - corner_counts).astype(np.int32))
+        all_materials.append(poly_slot)
+        all_smooth.append(poly_smooth)
+
+        with_normals = len(normals) > 0 and bool((n_idx >= 0).all())
+        if with_normals:
+            all_normals.append(normals[n_idx])
+
+        counts.append((len(used), len(loops), len(corner_counts)))
+        names.append(obj_name)
+        has_normals.append(with_normals)
+
+        slot_counts.append(len(slots))
+        for mat_name in slots:  # insertion order == slot order
+            if mat_name is None:
+                slot_materials.append(-1)
+                continue
+            if mat_name not in material_index:
+                material_index[mat_name] = len(material_names)
+                material_names.append(mat_name)
+            slot_materials.append(material_index[mat_name])
+
+    def _cat(parts, dtype, shape=(0,)):
+        return np.concatenate(parts).astype(dtype, copy=False) if parts else np.zeros(shape, dtype=dtype)
+
+    return {
+        "vertices": _cat(all_vertices, np.float32, (0, 3)),
+        "loops": _cat(all_loops, np.int32),
+        "poly_starts": _cat(all_starts, np.int32),
+        "poly_materials": _cat(all_materials, np.int32),
+        "poly_smooth": _cat(all_smooth, bool),
+        "normals": _cat(all_normals, np.float32, (0, 3)),
+        "object_counts": np.array(counts, dtype=np.int64).reshape(-1, 3),
+        "object_matrices": np.tile(np.eye(4, dtype=np.float32), (len(counts), 1, 1)),
+        "object_names": np.array(names, dtype=str),
+        "object_has_normals": np.array(has_normals, dtype=bool),
+        "slot_counts": np.array(slot_counts, dtype=np.int32),
+        "slot_materials": np.array(slot_materials, dtype=np.int32),
+        "material_names": np.array(material_names, dtype=str),
+        "material_colors": np.array([materials.get(n, DEFAULT_COLOR) for n in material_names],
+                                    dtype=np.float32).reshape(-1, 4),
+        "material_metallic": np.zeros(len(material_names), dtype=np.float32),
+        "material_roughness": np.full(len(material_names), DEFAULT_ROUGHNESS, dtype=np.float32),
+        "material_backface": np.zeros(len(material_names), dtype=bool),
+    }
+
+def load_obj_arrays(obj_path):
+    """Reads and parses an OBJ plus its MTL files."""
+    with open(obj_path, "rb") as f:
+        data = f.read()
+    materials = {}
+    for path in mtl_paths(data, obj_path):
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                materials.update(parse_mtl(f.read()))
+    name = os.path.splitext(os.path.basename(obj_path))[0]
+    return parse_obj(data, materials, name)
+
+# -----------------------------------------------------------------------------
+# SELF-TEST (no Blender needed)
+# -----------------------------------------------------------------------------
+
+SELF_TEST_CASES = [
+    # (name, OBJ text, expected loops, expected poly_starts)
+    ("plain", b"v 0 0 0\nv 1 0 0\nv 1 1 0\nf 1 2 3\n", [0, 1, 2], [0]),
+    ("relative", b"v 0 0 0\nv 1 0 0\nv 1 1 0\nf -3 -2 -1\n", [0, 1, 2], [0]),
+    ("repeated corner", b"v 0 0 0\nv 1 0 0\nv 1 1 0\nf 1 2 2 3\nf 1 1 2\n", [0, 1, 2], [0]),
+    ("mixed token forms", b"v 0 0 0\nv 1 0 0\nv 1 1 0\nv 0 1 0\nv 0 0 1\nv 1 0 1\nvn 0 0 1\n"
+                          b"f 1 2 3\nf 4//1 5//1 6//1\nf 1/1/1 2 3/1\n", [0, 1, 2, 3, 4, 5, 0, 1, 2], [0, 3, 6]),
+]
+
+def self_test():
+    failures = 0
+    for name, obj, loops, poly_starts in SELF_TEST_CASES:
+        arrays = parse_obj(obj)
+        ok = arrays["loops"].tolist() == loops and arrays["poly_starts"].tolist() == poly_starts
+        failures += not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {name}: loops {arrays['loops'].tolist()}, "
+              f"poly_starts {arrays['poly_starts'].tolist()}")
+    return failures
+
+# -----------------------------------------------------------------------------
+# MAIN ENTRY POINT
+# -----------------------------------------------------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parse OBJ files with the native loader (no Blender needed).",
+                                     epilog="Example: python3 obj_loader.py --self-test model_normalized.obj")
+    parser.add_argument("paths", nargs="*", help="OBJ files to parse; prints object/vertex/face counts")
+    parser.add_argument("--self-test", action="store_true", help="Run the built-in parser cases")
+    options = parser.parse_args()
+
+    if options.self_test and self_test():
+        raise SystemExit(1)
+    for path in options.paths:
+        arrays = load_obj_arrays(path)
+        print(f"{path}: {len(arrays['object_counts'])} objects, {len(arrays['vertices'])} vertices, "
+              f"{len(arrays['poly_starts'])} faces, {len(arrays['material_names'])} materials")
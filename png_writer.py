@@ -0,0 +1,179 @@
+import bpy
+import numpy as np
+import os
+import struct
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+# -----------------------------------------------------------------------------
+# PNG ENCODING (pure numpy + zlib, both release the GIL)
+# -----------------------------------------------------------------------------
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+COLOR_TYPES = {1: 0, 2: 4, 3: 2, 4: 6}  # channels -> PNG color type
+
+def _chunk(tag, data):
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xffffffff)
+
+def encode_png(image, compression=1):
+    """PNG bytes of a top-down (H, W, C) uint8/uint16 array; every row uses the 'Up' filter."""
+    height, width, channels = image.shape
+    bit_depth = 16 if image.dtype == np.uint16 else 8
+    rows = np.ascontiguousarray(image, dtype=">u2" if bit_depth == 16 else np.uint8).view(np.uint8).reshape(height, -1)
+
+    scanlines = np.empty((height, rows.shape[1] + 1), dtype=np.uint8)
+    scanlines[:, 0] = 2
+    scanlines[0, 1:] = rows[0]
+    np.subtract(rows[1:], rows[:-1], out=scanlines[1:, 1:])  # uint8 wrap-around == mod 256
+
+    header = struct.pack(">IIBBBBB", width, height, bit_depth, COLOR_TYPES[channels], 0, 0, 0)
+    return b"".join([
+        PNG_SIGNATURE,
+        _chunk(b"IHDR", header),
+        _chunk(b"IDAT", zlib.compress(scanlines.tobytes(), compression)),
+        _chunk(b"IEND", b""),
+    ])
+
+def srgb_oetf(linear):
+    return np.where(linear <= 0.0031308, linear * 12.92, 1.055 * np.power(linear, 1.0 / 2.4) - 0.055)
+
+def to_display(pixels, bit_depth=8, color_mode="RGBA", linear=True):
+    """
+    Blender float pixels (bottom-up RGBA) -> top-down integer image as Blender
+    would save it with the Standard view transform. `linear` buffers (render
+    result / Viewer Node) are premultiplied scene-linear; otherwise the values
+    are already display-encoded (a loaded PNG).
+    """
+    pixels = pixels[::-1]
+    rgb, alpha = pixels[..., :3], pixels[..., 3:4]
+    if linear:
+        if color_mode == "RGBA":
+            rgb = np.divide(rgb, alpha, out=np.zeros_like(rgb), where=alpha > 0)
+        rgb = srgb_oetf(np.clip(rgb, 0.0, 1.0))
+    out = np.concatenate([rgb, alpha], axis=-1) if color_mode == "RGBA" else rgb
+
+    scale, dtype = (65535, np.uint16) if bit_depth == 16 else (255, np.uint8)
+    return np.rint(np.clip(out, 0.0, 1.0) * scale).astype(dtype)
+
+def zlib_level(compression_percent):
+    """Blender's PNG compression percent -> zlib level."""
+    return min(9, compression_percent // 10)
+
+def write_png(image, filepath, compression=1):
+    data = encode_png(image, compression)
+    tmp_path = filepath + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    # A file under its final name is always complete
+    os.replace(tmp_path, filepath)
+
+# -----------------------------------------------------------------------------
+# ASYNC WRITER
+# -----------------------------------------------------------------------------
+
+class AsyncPngWriter:
+    """
+    Renders without write_still: the pixels are grabbed from the compositor's
+    Viewer Node and converted, encoded and written on a bounded thread pool,
+    so the next render overlaps with PNG I/O. submit() blocks once max_pending
+    images are queued. flush() waits for everything and re-raises the first
+    error; call it before journaling or linking to a written file.
+
+    The scene must use the Standard view transform (SceneTemplate sets it) so
+    the sRGB encoding done here matches what Blender itself would write.
+    """
+
+    def __init__(self, scene, threads=2, max_pending=8, compression=1, bit_depth=8, color_mode="RGBA"):
+        self.scene = scene
+        self.compression = compression
+        self.bit_depth = bit_depth
+        self.color_mode = color_mode
+        self.pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="png")
+        self.slots = threading.BoundedSemaphore(max_pending)
+        self.futures = []
+        self.written = 0
+        self._enable_viewer()
+
+    def _enable_viewer(self):
+        scene = self.scene
+        scene.use_nodes = True
+        scene.render.use_compositing = True
+        tree = scene.node_tree
+        layers = next((n for n in tree.nodes if n.type == 'R_LAYERS'), None) or tree.nodes.new('CompositorNodeRLayers')
+        viewer = next((n for n in tree.nodes if n.type == 'VIEWER'), None) or tree.nodes.new('CompositorNodeViewer')
+        tree.links.new(layers.outputs['Image'], viewer.inputs['Image'])
+        if hasattr(viewer, "use_alpha"):
+            viewer.use_alpha = True
+
+        view = scene.view_settings
+        if (view.view_transform, view.look, view.exposure, view.gamma) != ('Standard', 'None', 0.0, 1.0):
+            # to_display only knows plain sRGB; anything else would silently differ
+            # from what Blender writes without --async-png
+            raise ValueError(f"async PNG output needs the Standard view transform, scene uses '{view.view_transform}'")
+
+    def grab(self):
+        """Float RGBA pixels (bottom-up) of the last render."""
+        image = bpy.data.images['Viewer Node']
+        width, height = image.size
+        pixels = np.empty(width * height * 4, dtype=np.float32)
+        image.pixels.foreach_get(pixels)
+        return pixels.reshape(height, width, 4)
+
+    def render(self, filepath):
+        """Renders the scene as it is posed now and queues the PNG."""
+        bpy.ops.render.render()
+        self.submit(self.grab(), filepath)
+
+    def submit(self, pixels, filepath, linear=True):
+        self.slots.acquire()
+        future = self.pool.submit(self._write, pixels, filepath, linear)
+        future.add_done_callback(lambda _: self.slots.release())
+        self.futures.append(future)
+
+    def _write(self, pixels, filepath, linear):
+        write_png(to_display(pixels, self.bit_depth, self.color_mode, linear), filepath, self.compression)
+
+    def flush(self):
+        futures, self.futures = self.futures, []
+        errors = [f.exception() for f in futures]
+        self.written += len(futures)
+        for error in errors:
+            if error is not None:
+                raise error
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self.pool.shutdown()
+
+# -----------------------------------------------------------------------------
+# COMMAND LINE
+# -----------------------------------------------------------------------------
+
+def add_png_arguments(parser):
+    parser.add_argument("--async-png", action="store_true",
+                        help="Encode/write PNGs on background threads while the next view renders")
+    parser.add_argument("--png-threads", type=int, default=2,
+                        help="Encoder threads for --async-png")
+    parser.add_argument("--png-compression", type=int, default=15,
+                        help="PNG compression in percent, as in Blender's output settings (default: 15)")
+    parser.add_argument("--png-bit-depth", type=int, choices=[8, 16], default=8,
+                        help="Bits per channel")
+    parser.add_argument("--png-color", choices=["RGB", "RGBA"], default="RGBA",
+                        help="Keep or drop the (transparent) alpha channel")
+
+def setup_png_output(scene, options):
+    """Applies the PNG options to the scene; returns an AsyncPngWriter with --async-png, else None."""
+    settings = scene.render.image_settings
+    settings.file_format = 'PNG'
+    settings.color_mode = options.png_color
+    settings.color_depth = str(options.png_bit_depth)
+    settings.compression = options.png_compression
+
+    if not options.async_png:
+        return None
+    return AsyncPngWriter(scene, threads=options.png_threads, max_pending=4 * options.png_threads,
+                          compression=zlib_level(options.png_compression), bit_depth=options.png_bit_depth,
+                          color_mode=options.png_color)
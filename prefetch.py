@@ -0,0 +1,121 @@
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from obj_loader import load_obj_arrays
+
+# -----------------------------------------------------------------------------
+# PREFETCHED MODEL
+# -----------------------------------------------------------------------------
+
+class PrefetchedModel:
+    """What the background thread prepared for one model."""
+
+    def __init__(self, key, obj_path, arrays=None, staged_dir=None, parsed=False):
+        self.key = key
+        self.obj_path = obj_path        # original OBJ, or its copy in the staging folder
+        self.arrays = arrays            # mesh cache hit (or parsed OBJ): arrays already loaded
+        self.staged_dir = staged_dir
+        self.parsed = parsed            # arrays come from the native loader, not the mesh cache
+
+# -----------------------------------------------------------------------------
+# PREFETCHER
+# -----------------------------------------------------------------------------
+
+class ModelPrefetcher:
+    """
+    Reads the next models on a background thread while the current one renders.
+    The OBJ importer only takes a file path, so a cache miss is "prefetched" by
+    reading the OBJ, its MTL files and the sibling images/ folder once (pulling
+    them into the OS page cache), or, with staging_dir (e.g. /dev/shm), by
+    copying them there so the import reads from RAM. A mesh cache hit is
+    loaded into memory (np.load) right away. With loader='native' a miss is
+    parsed right away too (obj_loader), leaving only the mesh build to Blender.
+
+    schedule() models in order, then get() each one; release() drops its copy.
+    """
+
+    def __init__(self, mesh_cache=None, staging_dir=None, depth=1, loader="bpy"):
+        self.mesh_cache = mesh_cache
+        self.staging_dir = staging_dir
+        self.depth = depth
+        self.loader = loader
+        self.pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch")
+        self.pending = {}
+        self.bytes_read = 0
+        if staging_dir:
+            os.makedirs(staging_dir, exist_ok=True)
+
+    def schedule(self, key, obj_path):
+        if key not in self.pending:
+            self.pending[key] = self.pool.submit(self._fetch, key, obj_path)
+
+    def get(self, key, obj_path):
+        """The prefetched model (fetched synchronously if it was never scheduled)."""
+        future = self.pending.pop(key, None)
+        if future is None:
+            return self._fetch(key, obj_path)
+        return future.result()
+
+    def release(self, model):
+        if model is not None and model.staged_dir:
+            shutil.rmtree(model.staged_dir, ignore_errors=True)
+
+    def close(self):
+        for future in self.pending.values():
+            future.cancel()
+        self.pool.shutdown(wait=True)
+        for future in self.pending.values():
+            if future.done() and not future.cancelled() and future.exception() is None:
+                self.release(future.result())
+        self.pending = {}
+
+    def _model_files(self, obj_path):
+        """(path relative to the model folder, absolute path) of the OBJ, MTLs and images."""
+        obj_dir = os.path.dirname(obj_path)
+        model_dir = os.path.dirname(obj_dir)
+        files = [obj_path] + [os.path.join(obj_dir, n) for n in os.listdir(obj_dir) if n.endswith(".mtl")]
+        images_dir = os.path.join(model_dir, "images")
+        if os.path.isdir(images_dir):
+            files += [os.path.join(images_dir, n) for n in os.listdir(images_dir)]
+        return [(os.path.relpath(path, model_dir), path) for path in files if os.path.isfile(path)]
+
+    def _fetch(self, key, obj_path):
+        if self.mesh_cache:
+            arrays = self.mesh_cache.load(key)
+            if arrays is not None:
+                return PrefetchedModel(key, obj_path, arrays=arrays)
+
+        if not os.path.exists(obj_path):
+            return PrefetchedModel(key, obj_path)
+
+        if self.loader == "native":
+            try:
+                arrays = load_obj_arrays(obj_path)
+            except (OSError, ValueError, IndexError):
+                # The foreground load_native reports it
+                return PrefetchedModel(key, obj_path)
+            self.bytes_read += os.path.getsize(obj_path)
+            return PrefetchedModel(key, obj_path, arrays=arrays, parsed=True)
+
+        files = self._model_files(obj_path)
+        if not self.staging_dir:
+            for _, path in files:
+                with open(path, "rb") as f:
+                    while True:
+                        chunk = f.read(1 << 20)
+                        if not chunk:
+                            break
+                        self.bytes_read += len(chunk)
+            return PrefetchedModel(key, obj_path)
+
+        # Same relative layout, so the MTL's ../images/ references still resolve
+        staged_dir = tempfile.mkdtemp(dir=self.staging_dir)
+        for relative, path in files:
+            target = os.path.join(staged_dir, relative)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copyfile(path, target)
+            self.bytes_read += os.path.getsize(target)
+        staged_obj = os.path.join(staged_dir, os.path.relpath(obj_path, os.path.dirname(os.path.dirname(obj_path))))
+        return PrefetchedModel(key, staged_obj, staged_dir=staged_dir)
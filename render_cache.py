@@ -0,0 +1,58 @@
+import os
+import shutil
+
+# -----------------------------------------------------------------------------
+# ORIENTATION-KEYED RENDER CACHE
+# -----------------------------------------------------------------------------
+
+class OrientationCache:
+    """
+    Per-model map from the (quantized) RotationPivot rotation to the first file
+    rendered at that orientation. Camera and resolution are fixed per process,
+    so the same key means a pixel-identical image: 'base' for every angle, or a
+    random walk coming back to an orientation it already visited (X then -X).
+    Call reset() whenever the model changes.
+    """
+
+    def __init__(self, decimals=4):
+        self.decimals = decimals
+        self.views = {}
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, matrix):
+        # +0.0 folds -0.0 into 0.0 so both round to the same key
+        return tuple(round(matrix[r][c], self.decimals) + 0.0 for r in range(3) for c in range(3))
+
+    def claim(self, matrix, path):
+        """
+        Returns the path already claimed for this orientation (a hit: link it
+        once that render exists), or registers `path` as the one to render.
+        """
+        key = self.key(matrix)
+        source = self.views.get(key)
+        if source is not None:
+            self.hits += 1
+            return source
+        self.views[key] = path
+        self.misses += 1
+        return None
+
+    def reset(self):
+        self.views = {}
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def summary(self):
+        return f"{self.hits} hits / {self.hits + self.misses} views ({self.hit_rate():.1%})"
+
+def reuse_render(source_path, target_path):
+    """Hard-links (or copies, across filesystems) an earlier render to a new name."""
+    if os.path.exists(target_path):
+        os.remove(target_path)
+    try:
+        os.link(source_path, target_path)
+    except OSError:
+        shutil.copyfile(source_path, target_path)
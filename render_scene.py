@@ -0,0 +1,213 @@
+import bpy
+import math
+import numpy as np
+from bpy_extras.object_utils import world_to_camera_view
+from mathutils import Matrix, Vector, Euler
+
+from render_cache import reuse_render
+from stage_timer import NullTimer
+
+# -----------------------------------------------------------------------------
+# HELPER FUNCTIONS
+# -----------------------------------------------------------------------------
+
+def clear_scene():
+    """Clears everything: Meshes, Lights, Cameras, Collections."""
+    if bpy.context.active_object and bpy.context.active_object.mode != 'OBJECT':
+        bpy.ops.object.mode_set(mode='OBJECT')
+
+    for obj in list(bpy.data.objects):
+        bpy.data.objects.remove(obj, do_unlink=True)
+    for collection in list(bpy.data.collections):
+        bpy.data.collections.remove(collection)
+
+    for block in [bpy.data.meshes, bpy.data.materials, bpy.data.textures, bpy.data.images,
+                  bpy.data.cameras, bpy.data.lights]:
+        for item in list(block):
+            block.remove(item)
+
+def get_collection_center(objects):
+    """Center of mass (average of all vertices) in world space, one foreach_get per mesh."""
+    chunks = []
+    for obj in objects:
+        if obj.type == 'MESH':
+            co = np.empty(len(obj.data.vertices) * 3, dtype=np.float32)
+            obj.data.vertices.foreach_get("co", co)
+            world_matrix = np.array(obj.matrix_world, dtype=np.float64)
+            chunks.append(co.reshape(-1, 3) @ world_matrix[:3, :3].T + world_matrix[:3, 3])
+    points = np.concatenate(chunks) if chunks else np.zeros((0, 3))
+    return Vector(points.mean(axis=0)) if len(points) else Vector((0, 0, 0))
+
+# -----------------------------------------------------------------------------
+# SCENE TEMPLATE
+# -----------------------------------------------------------------------------
+
+class SceneTemplate:
+    """
+    Camera, RotationPivot, model collection and render settings, built ONCE per
+    process. Per model only the mesh datablocks are swapped (clear_model +
+    add_objects) and the pivot matrix is reset.
+    """
+
+    def __init__(self, camera_distance, resolution, backface_culling, collection_name="ImportedMeshes"):
+        clear_scene()
+        scene = bpy.context.scene
+        self.scene = scene
+
+        # Model collection (all swapped-in meshes live here)
+        self.collection = bpy.data.collections.new(collection_name)
+        scene.collection.children.link(self.collection)
+
+        # Pivot at the world origin
+        self.pivot = bpy.data.objects.new("RotationPivot", None)
+        self.pivot.empty_display_type = 'PLAIN_AXES'
+        scene.collection.objects.link(self.pivot)
+
+        # Camera (Strictly -Y, looking at the origin)
+        self.camera = bpy.data.objects.new("Camera", bpy.data.cameras.new("Camera"))
+        scene.collection.objects.link(self.camera)
+        self.camera.location = Vector((0, -camera_distance, 0))
+        self.camera.rotation_euler = Euler((math.radians(90), 0, 0), 'XYZ')
+        scene.camera = self.camera
+
+        # Render Settings
+        scene.render.engine = 'BLENDER_WORKBENCH'
+        scene.render.resolution_x = resolution
+        scene.render.resolution_y = resolution
+        scene.display.shading.light = 'STUDIO'
+        scene.display.shading.color_type = 'MATERIAL'
+        scene.display.shading.show_backface_culling = backface_culling
+        scene.render.film_transparent = True
+
+        # Plain sRGB output, so Blender's own PNGs and the async writer's
+        # encoding (png_writer.to_display) produce identical images
+        scene.view_settings.view_transform = 'Standard'
+        scene.view_settings.look = 'None'
+        scene.view_settings.exposure = 0.0
+        scene.view_settings.gamma = 1.0
+
+        self._template_names = {self.pivot.name, self.camera.name}
+
+        # Render border (off unless enable_render_border is called)
+        self.border_margin = None
+        self.model_corners = []
+
+    def keep(self, obj):
+        """Marks an extra helper object (e.g. atlas instances) as part of the template."""
+        self._template_names.add(obj.name)
+
+    def enable_render_border(self, margin_px=4):
+        """
+        Renders only the region the model's bounding box covers in each view.
+        The crop is off, so the PNG keeps its full size and everything outside
+        the border stays transparent, exactly as without the border. The margin
+        keeps Workbench's antialiasing filter inside the region.
+        """
+        self.border_margin = margin_px
+        self.scene.render.use_crop_to_border = False
+
+    def apply_render_border(self, pose):
+        """Sets the border to the projection of the pivot-posed model box (full frame if unsure)."""
+        if self.border_margin is None:
+            return
+        render = self.scene.render
+        points = [world_to_camera_view(self.scene, self.camera, pose @ corner) for corner in self.model_corners]
+        if not points or any(p.z <= 0.0 for p in points):
+            render.use_border = False
+            return
+
+        margin_x = self.border_margin / render.resolution_x
+        margin_y = self.border_margin / render.resolution_y
+        render.border_min_x = max(0.0, min(p.x for p in points) - margin_x)
+        render.border_max_x = min(1.0, max(p.x for p in points) + margin_x)
+        render.border_min_y = max(0.0, min(p.y for p in points) - margin_y)
+        render.border_max_y = min(1.0, max(p.y for p in points) + margin_y)
+        render.use_border = render.border_min_x < render.border_max_x and render.border_min_y < render.border_max_y
+
+    def add_objects(self, objects):
+        """Moves objects into the model collection and parents them to the (identity) pivot."""
+        self.reset_pivot()
+        for obj in objects:
+            for c in list(obj.users_collection):
+                if c != self.collection:
+                    c.objects.unlink(obj)
+            if self.collection not in obj.users_collection:
+                self.collection.objects.link(obj)
+            # Pivot is identity, so this keeps the current world transform
+            obj.parent = self.pivot
+            obj.matrix_parent_inverse = Matrix.Identity(4)
+
+        if self.border_margin is not None:
+            # Rest-pose box corners (8 per object, from the evaluated bound_box)
+            self.model_corners = [obj.matrix_world @ Vector(corner)
+                                  for obj in objects if obj.type == 'MESH' for corner in obj.bound_box]
+
+    def reset_pivot(self):
+        """Puts the Pivot back to identity, i.e. the rest pose of its children."""
+        self.pivot.matrix_world = Matrix.Identity(4)
+        bpy.context.view_layer.update()
+
+    def clear_model(self):
+        """Removes every non-template object/collection and the datablocks they used."""
+        if bpy.context.active_object and bpy.context.active_object.mode != 'OBJECT':
+            bpy.ops.object.mode_set(mode='OBJECT')
+
+        doomed = [obj for obj in bpy.data.objects if obj.name not in self._template_names]
+        doomed += [c for c in bpy.data.collections if c != self.collection]
+        bpy.data.batch_remove(doomed)
+        self.model_corners = []
+
+        for block in [bpy.data.meshes, bpy.data.materials, bpy.data.textures, bpy.data.images]:
+            # Keep Blender's own Render Result / Viewer Node images
+            orphans = [item for item in block
+                       if item.users == 0 and getattr(item, "type", 'IMAGE') not in {'RENDER_RESULT', 'COMPOSITING'}]
+            if orphans:
+                bpy.data.batch_remove(orphans)
+
+        self.reset_pivot()
+
+# -----------------------------------------------------------------------------
+# RENDERING
+# -----------------------------------------------------------------------------
+
+def render_views(template, views, view_cache=None, atlas=None, png_writer=None, timer=None):
+    """
+    Renders a list of (pivot_pose, filepath) views of the current model.
+    Orientations already claimed in view_cache are linked instead of rendered.
+    With an AtlasRenderer, the distinct views are rendered several per call.
+    With an AsyncPngWriter, PNGs are written in the background and flushed
+    before returning, so every file exists once this returns.
+    Stage times go to the (optional) StageTimer.
+    """
+    timer = timer or NullTimer()
+    unique, duplicates = [], []
+    for pose, filepath in views:
+        source = view_cache.claim(pose, filepath) if view_cache else None
+        if source:
+            duplicates.append((source, filepath))
+        else:
+            unique.append((pose, filepath))
+
+    if atlas:
+        with timer.stage("render_atlas"):
+            atlas.render(unique)
+    else:
+        for pose, filepath in unique:
+            template.pivot.matrix_world = pose
+            template.apply_render_border(pose)
+            with timer.stage("render"):
+                if png_writer:
+                    png_writer.render(filepath)
+                else:
+                    template.scene.render.filepath = filepath
+                    bpy.ops.render.render(write_still=True)
+
+    # Duplicates link to the written files
+    if png_writer:
+        with timer.stage("png_flush"):
+            png_writer.flush()
+
+    with timer.stage("link"):
+        for source, filepath in duplicates:
+            reuse_render(source, filepath)
+    timer.note(views=len(views), rendered=len(unique))
@@ -0,0 +1,51 @@
+import argparse
+import hashlib
+
+# -----------------------------------------------------------------------------
+# COUNTER-BASED ROTATION PLAN
+# -----------------------------------------------------------------------------
+# Every (axis, direction) step is a pure function of (dataset, item, angle, step):
+# no shared RNG state, so any shard/worker split or processing order renders
+# the same sequences, and plans can be computed without Blender.
+
+AXES = ('X', 'Y', 'Z')
+SEQUENCE_RNGS = ("hash", "legacy")
+
+def angle_token(angle):
+    """Canonical text of an angle: 15 and 15.0 -> '15', 22.5 -> '22.5' (as in the output folders)."""
+    angle = float(angle)
+    return str(int(angle)) if angle.is_integer() else str(angle)
+
+def step_at(dataset, item, angle, step):
+    """(axis, direction) of one step, from a 64-bit BLAKE2b hash of its coordinates."""
+    key = f"{dataset}|{item}|{angle_token(angle)}|{step}".encode("utf-8")
+    value = int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "big")
+    return AXES[value % 3], (1 if (value >> 32) & 1 else -1)
+
+def hashed_steps(dataset, item, angle, step_count):
+    """Steps 0..step_count-1 of the sequence of `item` (model_id, or 'amount/seed') at `angle`."""
+    return [step_at(dataset, item, angle, step) for step in range(step_count)]
+
+def step_names(steps):
+    """File stems base, base_X, base_X_-Z, ... for base + every step."""
+    names = ["base"]
+    for axis, direction in steps:
+        names.append(f"{names[-1]}_{'-' if direction == -1 else ''}{axis}")
+    return names
+
+# -----------------------------------------------------------------------------
+# MAIN ENTRY POINT
+# -----------------------------------------------------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Print the rotation plan of a sequence (no Blender needed).",
+                                     epilog="Example: python3 rotation_plan.py ShapeNet 10839d0dc35c94fcf4fb4dee5181bee 15")
+    parser.add_argument("dataset", choices=["ShapeNet", "ShapeGen"])
+    parser.add_argument("item", help="ShapeNet model_id, or ShapeGen 'amount/seed'")
+    parser.add_argument("angles", nargs="+", type=float, help="Rotation step(s) in degrees")
+    parser.add_argument("--steps", type=int, default=None,
+                        help="Rotations per sequence (default: 6 for ShapeNet, 7 for ShapeGen)")
+    options = parser.parse_args()
+
+    step_count = options.steps or (6 if options.dataset == "ShapeNet" else 7)
+    for angle in options.angles:
+        print(f"{angle_token(angle)}: {step_names(hashed_steps(options.dataset, options.item, angle, step_count))[-1]}.png")
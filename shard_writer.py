@@ -0,0 +1,140 @@
+import io
+import json
+import os
+import shutil
+import tarfile
+import tempfile
+import time
+
+from completion_journal import clear_partial_output
+
+# -----------------------------------------------------------------------------
+# OUTPUT BACKENDS
+# -----------------------------------------------------------------------------
+# Both backends take a sequence key such as '15/02747177/<model_id>' or
+# '15/<amount>/<seed>'. prepare(key) returns the folder the renders go to,
+# finish(key, meta) is called once every render of the sequence is written.
+
+class DirectoryOutput:
+    """Classic layout: one folder of PNGs per sequence under root."""
+
+    def __init__(self, root):
+        self.root = root
+
+    def prepare(self, key):
+        folder = os.path.join(self.root, *key.split('/'))
+        clear_partial_output(folder)
+        os.makedirs(folder, exist_ok=True)
+        return folder
+
+    def finish(self, key, meta=None):
+        pass
+
+    def close(self):
+        pass
+
+
+class TarShardOutput:
+    """
+    WebDataset-style tar shards. Renders go to a local staging folder; finish()
+    appends the whole sequence as '<key>.<view>.png' members plus '<key>.json'
+    metadata to the current shard, so a sample never straddles two shards.
+    A new shard starts once the current one exceeds max_bytes.
+
+    Every process writes its own '<prefix>-NNNNNN.tar' files and one
+    '<prefix>.index.jsonl' (key -> shard, member offsets and sizes).
+    """
+
+    def __init__(self, root, prefix, max_bytes=1024 ** 3):
+        self.root = root
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        os.makedirs(root, exist_ok=True)
+
+        self.staging = tempfile.mkdtemp(prefix=f"{prefix}-staging-")
+        self.index = open(os.path.join(root, f"{prefix}.index.jsonl"), "a")
+        self.shard_number = -1
+        self.tar = None
+        self.tar_file = None
+        self.shard_path = None
+
+    def prepare(self, key):
+        folder = os.path.join(self.staging, *key.split('/'))
+        if os.path.isdir(folder):
+            shutil.rmtree(folder)
+        os.makedirs(folder)
+        return folder
+
+    def _open_next_shard(self):
+        self._close_shard()
+        self.shard_number += 1
+        self.shard_path = os.path.join(self.root, f"{self.prefix}-{self.shard_number:06d}.tar")
+        self.tar_file = open(self.shard_path, "wb")
+        self.tar = tarfile.open(fileobj=self.tar_file, mode="w", format=tarfile.USTAR_FORMAT)
+
+    def _close_shard(self):
+        if self.tar is not None:
+            self.tar.close()
+            self.tar_file.close()
+            self.tar = None
+
+    def _add(self, info, fileobj):
+        """Appends one member; returns its index entry (byte offset of the data in the shard)."""
+        header = info.tobuf(self.tar.format, self.tar.encoding, self.tar.errors)
+        offset = self.tar.offset + len(header)
+        self.tar.addfile(info, fileobj)
+        return {"name": info.name, "offset": offset, "size": info.size}
+
+    def finish(self, key, meta=None):
+        folder = os.path.join(self.staging, *key.split('/'))
+        if self.tar is None or self.tar_file.tell() >= self.max_bytes:
+            self._open_next_shard()
+
+        members = []
+        for name in sorted(os.listdir(folder)):
+            path = os.path.join(folder, name)
+            # Always a regular member: the orientation cache hard-links repeated
+            # views, and gettarinfo() would turn those into 0-byte link members
+            info = tarfile.TarInfo(f"{key}.{name}")
+            info.size = os.path.getsize(path)
+            info.mtime = int(os.path.getmtime(path))
+            if info.size == 0:
+                raise ValueError(f"empty render {path} in sequence {key}")
+            with open(path, "rb") as f:
+                members.append(self._add(info, f))
+
+        blob = json.dumps(dict(meta or {}, key=key), sort_keys=True).encode("utf-8")
+        info = tarfile.TarInfo(f"{key}.json")
+        info.size = len(blob)
+        info.mtime = int(time.time())
+        members.append(self._add(info, io.BytesIO(blob)))
+
+        # Sample is complete on disk before the caller journals it
+        self.tar_file.flush()
+        os.fsync(self.tar_file.fileno())
+
+        self.index.write(json.dumps({"key": key, "shard": os.path.basename(self.shard_path), "members": members}) + "\n")
+        self.index.flush()
+
+        shutil.rmtree(folder)
+
+    def close(self):
+        self._close_shard()
+        self.index.close()
+        shutil.rmtree(self.staging, ignore_errors=True)
+
+
+def open_output(output_format, root, prefix, shard_mb=1024):
+    """Factory used by the batch scripts' --output-format option."""
+    if output_format == "tar":
+        return TarShardOutput(os.path.join(root, "shards"), prefix, int(shard_mb * 1024 ** 2))
+    return DirectoryOutput(root)
+
+
+def sequence_meta(views, **info):
+    """JSON-friendly rotation metadata: view names and the pivot matrix of each."""
+    return dict(info, views=[
+        {"name": os.path.splitext(os.path.basename(filepath))[0],
+         "pivot_matrix": [[round(v, 6) for v in row] for row in pose]}
+        for pose, filepath in views
+    ])
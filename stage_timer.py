@@ -0,0 +1,124 @@
+import contextlib
+import json
+import os
+import resource
+import sys
+import time
+
+# -----------------------------------------------------------------------------
+# HELPER FUNCTIONS
+# -----------------------------------------------------------------------------
+
+def peak_rss_mb():
+    """Peak resident set size of this process (ru_maxrss is KB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def current_rss_mb():
+    """Resident set size now (/proc on Linux; falls back to the peak elsewhere)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return peak_rss_mb()
+
+def mesh_stats(objects):
+    """Object, vertex and face counts of the mesh objects."""
+    meshes = [o.data for o in objects if o.type == 'MESH']
+    return {
+        "objects": len(meshes),
+        "vertices": sum(len(m.vertices) for m in meshes),
+        "faces": sum(len(m.polygons) for m in meshes),
+    }
+
+# -----------------------------------------------------------------------------
+# TIMERS
+# -----------------------------------------------------------------------------
+
+class StageTimer:
+    """
+    One JSONL record per model: wall time per named stage (summed when a stage
+    runs several times), the duration of every render call, mesh counts and
+    peak RSS. Each process appends to its own '<writer_name>.jsonl' in folder.
+    """
+
+    def __init__(self, folder, writer_name):
+        os.makedirs(folder, exist_ok=True)
+        self.path = os.path.join(folder, f"{writer_name}.jsonl")
+        self._file = open(self.path, "a")
+        self.record = None
+        self._start = None
+
+    def start(self, model, **info):
+        self.record = dict(info, model=model, stages={}, calls={}, render_seconds=[])
+        self._start = time.perf_counter()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name, seconds):
+        if self.record is None:
+            return
+        stages, calls = self.record["stages"], self.record["calls"]
+        stages[name] = stages.get(name, 0.0) + seconds
+        calls[name] = calls.get(name, 0) + 1
+        if name == "render":
+            self.record["render_seconds"].append(round(seconds, 4))
+
+    def note(self, **fields):
+        if self.record is not None:
+            self.record.update(fields)
+
+    def finish(self):
+        if self.record is None:
+            return
+        record, self.record = self.record, None
+        record["stages"] = {name: round(seconds, 4) for name, seconds in record["stages"].items()}
+        record["total"] = round(time.perf_counter() - self._start, 4)
+        record["peak_rss_mb"] = round(peak_rss_mb(), 1)
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+
+    def event(self, name, **fields):
+        """Standalone record, e.g. the one-time scene setup."""
+        self._file.write(json.dumps(dict(fields, event=name, peak_rss_mb=round(peak_rss_mb(), 1))) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class NullTimer:
+    """Drop-in StageTimer that records nothing (timing log disabled)."""
+
+    _noop = contextlib.nullcontext()
+
+    def start(self, model, **info):
+        pass
+
+    def stage(self, name):
+        return self._noop
+
+    def add(self, name, seconds):
+        pass
+
+    def note(self, **fields):
+        pass
+
+    def finish(self):
+        pass
+
+    def event(self, name, **fields):
+        pass
+
+    def close(self):
+        pass
+
+
+def open_timer(folder, writer_name):
+    return StageTimer(folder, writer_name) if folder else NullTimer()